@@ -1,31 +1,146 @@
-import json
+import asyncio
+import hashlib
+import itertools
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from enum import Enum
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
-from fastapi import APIRouter, HTTPException, Body
+import orjson
+from fastapi import APIRouter, HTTPException, Body, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
 from backend.models.models import SupplyChain, Event, RiskScore
 from backend.services.bayesian_risk_assessment_service import BayesianRiskAssessmentService
 from backend.services.db_service import DBService
+from backend.services.event_aggregation import aggregate_events
 from backend.services.event_detection_service import EventDetectionService
 from backend.services.event_relevance_assessment_service import EventRelevanceAssessmentService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 db_service = DBService()
-event_service = EventDetectionService()
+event_service = EventDetectionService(db_service)
 event_relevance_service = EventRelevanceAssessmentService()
 bayesian_service = BayesianRiskAssessmentService()
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
 
+def _default(obj):
+    """orjson fallback for values it does not serialize natively."""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_response(payload) -> Response:
+    """Serialize the payload once with orjson and return the raw bytes, bypassing FastAPI's encoder."""
+    return Response(
+        content=orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS),
+        media_type="application/json"
+    )
+
+
+_events_adapter = TypeAdapter(List[Event])
+
+
+def _events_response(key: str, events: List[Event]) -> Response:
+    """Serialize a list of events straight to JSON bytes with pydantic's Rust serializer."""
+    return Response(
+        content=b'{"%s":%s}' % (key.encode(), _events_adapter.dump_json(events)),
+        media_type="application/json"
+    )
+
+
+def _stream_json_array(key: str, records: Iterator[bytes]) -> Iterator[bytes]:
+    yield b'{"%s":[' % key.encode()
+    try:
+        for i, record in enumerate(records):
+            yield record if i == 0 else b"," + record
+    except Exception:
+        # The status has already been sent; log why the body ends early.
+        logger.exception("Error streaming %s", key)
+        raise
+    yield b"]}"
+
+
+async def _stream_events_response(key: str, records: Iterator[bytes]) -> StreamingResponse:
+    """
+    Stream pre-serialized event records as a JSON object without holding the full list in memory.
+    The first record is read before the response starts, so that errors running the query are
+    raised here (and can be answered with an error status) rather than after the 200 is sent.
+    """
+    records = iter(records)
+    first = await asyncio.to_thread(next, records, None)
+    if first is not None:
+        records = itertools.chain((first,), records)
+    return StreamingResponse(_stream_json_array(key, records), media_type="application/json")
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    return request.headers.get("if-none-match") == etag
+
+
+# cache key -> (source the response was built from, response bytes, ETag)
+_DERIVED_RESPONSES: Dict[str, Tuple[Any, bytes, str]] = {}
+
+
+def _cached_json_response(request: Request, cache_key: str, source, build: Callable[[Any], bytes]) -> Response:
+    """
+    Serve JSON built from stored data, rebuilding it only when the source changes.
+    Honors If-None-Match so that unchanged payloads are answered with 304.
+    """
+    cached = _DERIVED_RESPONSES.get(cache_key)
+    if cached is None or cached[0] != source:
+        content = build(source)
+        cached = (source, content, f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"')
+        _DERIVED_RESPONSES[cache_key] = cached
+    _, content, etag = cached
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
+
+# Distinguishes data versions of this process from those of an earlier run of the backend.
+_PROCESS_TOKEN = uuid.uuid4().hex[:12]
+
+
+def _data_etag(key: str) -> str:
+    """Cheap ETag for responses built from stored data: it changes whenever the database is written."""
+    return f'"{_PROCESS_TOKEN}-{db_service.data_version()}-{key}"'
+
+
+# Supply chain example files parsed once at startup, keyed by file suffix (e.g. "01").
+SUPPLY_CHAIN_CACHE: Dict[str, bytes] = {}
+SUPPLY_CHAIN_MODELS: Dict[str, SupplyChain] = {}
+
+
+def _load_supply_chain_file(file_path: Path) -> Tuple[bytes, dict, SupplyChain]:
+    """Read a supply chain file and validate the model directly from its bytes."""
+    raw = file_path.read_bytes()
+    return raw, orjson.loads(raw), SupplyChain.model_validate_json(raw)
+
+
 @router.on_event("startup")
 def initialize_supply_chains():
-    supply_chain_files = DATA_DIR.glob("SC_Example_*.json")
-    for file_path in supply_chain_files:
-        try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
+    supply_chain_files = sorted(DATA_DIR.glob("SC_Example_*.json"))
+    # Read and parse the files concurrently; results are consumed in file order.
+    with ThreadPoolExecutor() as executor:
+        futures = [(file_path, executor.submit(_load_supply_chain_file, file_path)) for file_path in supply_chain_files]
+        for file_path, future in futures:
+            try:
+                raw, data, model = future.result()
                 supply_chain = {
                     "id": str(data["id"]),
                     "companyName": data.get("companyName", "Unknown Company"),
@@ -34,13 +149,17 @@ def initialize_supply_chains():
                     "edges": data.get("edges", [])
                 }
                 db_service.add_supply_chain(supply_chain)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading supply chain file {file_path}: {e}")
+
+                key = file_path.stem[len("SC_Example_"):]
+                SUPPLY_CHAIN_CACHE[key] = raw
+                SUPPLY_CHAIN_MODELS[key] = model
+            except (FileNotFoundError, ValueError) as e:
+                logger.error("Error loading supply chain file %s: %s", file_path, e)
 
 
 # Welcome endpoint
 @router.get("/")
-def read_root():
+async def read_root():
     return {"message": "Welcome to the Supply Chain Tool API"}
 
 
@@ -49,46 +168,44 @@ def read_root():
 # ================================
 
 @router.get("/supply_chains")
-def get_supply_chains():
+async def get_supply_chains(request: Request):
     """Fetch all supply chains from the database."""
-    supply_chains = db_service.get_all_supply_chains()
-    return {"supply_chains": supply_chains}
+    supply_chains = await asyncio.to_thread(db_service.get_all_supply_chains_raw)
+    return _cached_json_response(
+        request, "supply_chains", supply_chains,
+        lambda records: b'{"supply_chains":[' + b",".join(records) + b"]}"
+    )
 
 
 @router.post("/supply_chains/selected")
-def set_selected_supply_chain(body: dict = Body(...)):
+async def set_selected_supply_chain(body: dict = Body(...)):
     """Set the currently selected supply chain."""
     supply_chain_id = body.get("supply_chain_id")
     if not supply_chain_id:
         raise HTTPException(status_code=400, detail="supply_chain_id is required.")
-    supply_chain = db_service.get_supply_chain(supply_chain_id)
+    supply_chain = await asyncio.to_thread(db_service.get_supply_chain, supply_chain_id)
     if not supply_chain:
         raise HTTPException(status_code=404, detail=f"Supply chain {supply_chain_id} not found.")
-    db_service.save_selected_supply_chain(supply_chain_id)
+    await asyncio.to_thread(db_service.save_selected_supply_chain, supply_chain_id)
     return {"message": f"Supply chain {supply_chain_id} set as selected."}
 
 
 @router.get("/supply_chains/selected")
-def get_selected_supply_chain():
+async def get_selected_supply_chain():
     """Fetch the currently selected supply chain."""
-    supply_chain_id = db_service.get_selected_supply_chain()
+    supply_chain_id = await asyncio.to_thread(db_service.get_selected_supply_chain)
     if not supply_chain_id:
         raise HTTPException(status_code=404, detail="No supply chain selected.")
-    return db_service.get_supply_chain(supply_chain_id)
+    return await asyncio.to_thread(db_service.get_supply_chain, supply_chain_id)
 
 
 @router.get("/supply_chains/{id}")
-def get_supply_chain(id: int):
+async def get_supply_chain(id: int):
     """Fetch predefined supply chain data based on the provided ID."""
-    file_name = f"SC_Example_0{id}.json"
-    try:
-        with open(DATA_DIR / file_name, "r") as f:
-            data = json.load(f)
-        return data
-    except FileNotFoundError:
-        return {"error": f"Supply chain file not found: {file_name}."}
-    except json.JSONDecodeError:
-        return {"error": "Error decoding supply chain JSON file."}
+    data = SUPPLY_CHAIN_CACHE.get(f"0{id}")
+    if data is None:
+        return {"error": f"Supply chain file not found: SC_Example_0{id}.json."}
+    return Response(content=data, media_type="application/json")
 
 
 # ================================
@@ -96,7 +213,7 @@ def get_supply_chain(id: int):
 # ================================
 
 @router.get("/events/new")
-def fetch_new_events(
+async def fetch_new_events(
         query: str = "supply chain disruptions OR supply chain risks OR geopolitical challenges",
         from_date: str = None,
         to_date: str = None,
@@ -107,62 +224,115 @@ def fetch_new_events(
     Accepts a query, optional date range, and page size.
     """
     try:
-        events = event_service.process_events(query, page_size, from_date, to_date)
-        return {"events": [event.dict() for event in events]}
+        events = await event_service.process_events(query, page_size, from_date, to_date)
+        return _events_response("events", events)
     except Exception as e:
         return {"error": f"Failed to fetch and process events: {str(e)}"}
 
 
+@router.post("/events/backfill")
+async def start_events_backfill(
+        query: str = "supply chain disruptions OR supply chain risks OR geopolitical challenges",
+        from_date: str = None,
+        to_date: str = None,
+        page_size: int = 100
+):
+    """
+    Start a bulk backfill that processes articles through the OpenAI Batch API.
+    Call POST /events/backfill/{job_id} until its status is "completed".
+    """
+    try:
+        return await event_service.start_backfill(query, page_size, from_date, to_date)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start backfill: {str(e)}")
+
+
+@router.get("/events/backfill/{job_id}")
+async def get_events_backfill(job_id: str):
+    """Return the status of a backfill job as stored, without advancing it."""
+    job = await event_service.get_backfill(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backfill job {job_id} not found.")
+    return job
+
+
+@router.post("/events/backfill/{job_id}")
+async def advance_events_backfill(job_id: str):
+    """Advance a backfill job if its current batch has finished and return its status."""
+    try:
+        job = await event_service.advance_backfill(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update backfill: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backfill job {job_id} not found.")
+    return job
+
+
 @router.get("/events/saved")
-def get_saved_events():
+async def get_saved_events():
     """Retrieve all saved events from the database."""
     try:
-        events = db_service.get_all_events()
-        return {"events": [event.dict() for event in events]}
+        return await _stream_events_response("events", db_service.iter_all_events_raw())
     except Exception as e:
         return {"error": f"Failed to retrieve saved events: {str(e)}"}
 
 
 @router.post("/supply_chains/{id}/events/assess")
-def assess_unassessed_events(id: int):
+async def assess_unassessed_events(id: int):
     """Assess unassessed events for a given supply chain."""
-    try:
-        file_name = f"SC_Example_0{id}.json"
-        with open(DATA_DIR / file_name, "r") as f:
-            supply_chain_data = json.load(f)
-        supply_chain = SupplyChain(**supply_chain_data)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail=f"Supply chain file not found: {file_name}.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error loading supply chain: {e}")
+    supply_chain = SUPPLY_CHAIN_MODELS.get(f"0{id}")
+    if supply_chain is None:
+        raise HTTPException(status_code=404, detail=f"Supply chain file not found: SC_Example_0{id}.json.")
 
     try:
-        events = db_service.get_unassessed_events()
+        events = await asyncio.to_thread(db_service.get_unassessed_events)
         if not events:
             return {"message": "No unassessed events found."}
 
-        assessed_events = event_relevance_service.assess_events(supply_chain, events)
+        assessed_events = await event_relevance_service.assess_events_async(supply_chain, events)
 
-        for event in assessed_events:
-            db_service.save_event_assessment(event)
+        await asyncio.to_thread(db_service.save_events, assessed_events)
 
-        return {"assessed_events": [event.dict() for event in assessed_events]}
+        return _events_response("assessed_events", assessed_events)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to assess event risk: {str(e)}")
 
 
 @router.get("/supply_chains/{id}/events/assessed")
-def get_assessed_events(id: int):
+async def get_assessed_events(id: int, request: Request):
     """
     Retrieve events that have already been assessed for the given supply chain.
+    Honors If-None-Match so that unchanged events are answered with 304.
     """
+    etag = _data_etag(f"assessed/{id}")
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     try:
-        assessed_events = db_service.get_assessed_events(str(id))
-        return {"assessed_events": [event.dict() for event in assessed_events]}
+        response = await _stream_events_response("assessed_events", db_service.iter_assessed_events_raw(str(id)))
+        response.headers["ETag"] = etag
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve assessed events: {str(e)}")
 
 
+@router.get("/supply_chains/{id}/events/assessed/aggregates")
+async def get_assessed_event_aggregates(id: int, request: Request):
+    """
+    Retrieve the counts per risk level, risk class and risk family of the assessed events of the
+    given supply chain, instead of the events themselves. Honors If-None-Match like the events endpoint.
+    """
+    etag = _data_etag(f"aggregates/{id}")
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    try:
+        aggregates = await asyncio.to_thread(aggregate_events, db_service.iter_assessed_events_raw(str(id)))
+        response = _json_response(aggregates)
+        response.headers["ETag"] = etag
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to aggregate assessed events: {str(e)}")
+
+
 @router.put("/events/update")
 async def update_event(event_data: Event):
     """
@@ -172,12 +342,11 @@ async def update_event(event_data: Event):
     event_id = event_data.id
     if not event_id:
         raise HTTPException(status_code=400, detail="Event ID is required")
-    existing_event = db_service.get_event_by_id(event_id)
-    if not existing_event:
+    if not await asyncio.to_thread(db_service.event_exists, event_id):
         raise HTTPException(status_code=404, detail="Event not found")
     try:
-        db_service.save_event_assessment(event_data)
-        return {"message": "Event updated successfully", "event": event_data.dict()}
+        await asyncio.to_thread(db_service.save_event_assessment, event_data)
+        return {"message": "Event updated successfully", "event": event_data.model_dump()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update event: {str(e)}")
 
@@ -191,23 +360,22 @@ async def delete_event(event_data: Event):
     event_id = event_data.id
     if not event_id:
         raise HTTPException(status_code=400, detail="Event ID is required")
-    existing_event = db_service.get_event_by_id(event_id)
-    if not existing_event:
+    if not await asyncio.to_thread(db_service.event_exists, event_id):
         raise HTTPException(status_code=404, detail="Event not found")
     try:
-        db_service.delete_event(event_id)
+        await asyncio.to_thread(db_service.delete_event, event_id)
         return {"message": "Event deleted successfully", "event_id": event_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete event: {str(e)}")
 
 
 @router.post("/events/reset-assessments")
-def reset_event_assessments():
+async def reset_event_assessments():
     """
     Reset the risk assessments for all events in the database.
     """
     try:
-        db_service.reset_all_event_assessments()
+        await asyncio.to_thread(db_service.reset_all_event_assessments)
         return {"message": "Risk assessments have been reset for all events."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reset event risk assessments: {e}")
@@ -218,42 +386,71 @@ def reset_event_assessments():
 # ================================
 
 @router.get("/supply_chains/selected/risk_scores")
-def compute_bayesian_risk_scores():
+async def compute_bayesian_risk_scores():
     """
     Computes Bayesian risk scores for the currently selected supply chain
     using assessed events and saves the result in the database.
     """
-    supply_chain_id = db_service.get_selected_supply_chain()
+    supply_chain_id = await asyncio.to_thread(db_service.get_selected_supply_chain)
     if not supply_chain_id:
         raise HTTPException(status_code=404, detail="No supply chain selected.")
-    events = db_service.get_assessed_events(supply_chain_id)
+    events = await asyncio.to_thread(db_service.get_assessed_events, supply_chain_id)
     if not events:
         return {"message": f"No assessed events found for supply chain {supply_chain_id}."}
-    risk_score: RiskScore = bayesian_service.compute_geopolitical_risk_scores(
+    risk_score: RiskScore = await asyncio.to_thread(
+        bayesian_service.compute_geopolitical_risk_scores,
         supply_chain_id=str(supply_chain_id),
         events=events,
         kappa=5.0,
         default_no_data_score=0.1
     )
-    db_service.add_or_update_risk_score(risk_score)
-    return {
+    await asyncio.to_thread(db_service.add_or_update_risk_score, risk_score)
+    return _json_response({
         "supply_chain_id": risk_score.supply_chain_id,
         "risk_scores": {category.value: score for category, score in risk_score.scores.items()}
-    }
+    })
 
 
 @router.get("/supply_chains/selected/risk_scores/stored")
-def get_stored_bayesian_risk_scores():
+async def get_stored_bayesian_risk_scores(request: Request):
     """
     Retrieves the stored Bayesian risk scores for the currently selected supply chain.
     """
-    supply_chain_id = db_service.get_selected_supply_chain()
+    supply_chain_id = await asyncio.to_thread(db_service.get_selected_supply_chain)
     if not supply_chain_id:
         raise HTTPException(status_code=404, detail="No supply chain selected.")
-    stored_score = db_service.get_risk_score(str(supply_chain_id))
+    stored_score = await asyncio.to_thread(db_service.get_risk_score_raw, str(supply_chain_id))
     if not stored_score:
         return {"message": f"No stored risk scores found for supply chain {supply_chain_id}."}
-    return {
-        "supply_chain_id": stored_score.supply_chain_id,
-        "risk_scores": {category: score for category, score in stored_score.scores.items()}
-    }
+
+    def build(raw: bytes) -> bytes:
+        record = orjson.loads(raw)
+        return orjson.dumps({"supply_chain_id": record["supply_chain_id"], "risk_scores": record["scores"]})
+
+    return _cached_json_response(request, f"risk_scores/{supply_chain_id}", stored_score, build)
+
+
+@router.get("/supply_chains/{id}/dashboard")
+async def get_dashboard(id: int, request: Request):
+    """
+    Retrieve everything the risk dashboard loads in one response: the aggregates of the assessed
+    events of the given supply chain (as returned by the aggregates endpoint) and its stored
+    Bayesian risk scores (as returned by the stored risk scores endpoint).
+    Honors If-None-Match like the events endpoint.
+    """
+    etag = _data_etag(f"dashboard/{id}")
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    try:
+        aggregates = await asyncio.to_thread(aggregate_events, db_service.iter_assessed_events_raw(str(id)))
+        stored_score = await asyncio.to_thread(db_service.get_risk_score_raw, str(id))
+        if stored_score:
+            record = orjson.loads(stored_score)
+            stored_risk_scores = {"supply_chain_id": record["supply_chain_id"], "risk_scores": record["scores"]}
+        else:
+            stored_risk_scores = {"message": f"No stored risk scores found for supply chain {id}."}
+        response = _json_response({"assessed_event_aggregates": aggregates, "stored_risk_scores": stored_risk_scores})
+        response.headers["ETag"] = etag
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve dashboard data: {str(e)}")
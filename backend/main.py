@@ -1,6 +1,14 @@
+import logging
+import os
+
 from fastapi import FastAPI
 from backend.api.routes import router
 
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "WARNING").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 app = FastAPI()
 
 app.include_router(router)
@@ -74,6 +74,12 @@ class GeopoliticalRiskCategory(str, Enum):
     INTERSTATE_CONFLICT = "Interstate Conflict"
 
 
+# Lowercased category values, computed once since the enum is immutable.
+GEOPOLITICAL_CATEGORY_LOWER: Dict[GeopoliticalRiskCategory, str] = {
+    cat: cat.value.lower() for cat in GeopoliticalRiskCategory
+}
+
+
 # Risk Score Model
 class RiskScore(BaseModel):
     supply_chain_id: str  # Link to the relevant supply chain
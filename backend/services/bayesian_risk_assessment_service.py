@@ -1,13 +1,59 @@
 from typing import List, Dict
-import pymc as pm
+import numpy as np
+from scipy.integrate import trapezoid
+from scipy.special import betaln
+from scipy.stats import beta
 
 from backend.models.models import (
     Event,
     RiskScore,
-    GeopoliticalRiskCategory
+    GeopoliticalRiskCategory,
+    GEOPOLITICAL_CATEGORY_LOWER
 )
 
 
+# Grid over theta used to integrate the (non-conjugate) posterior numerically.
+_THETA_GRID = np.linspace(0.0, 1.0, 2001)[1:-1]
+_LOG_PRIOR = beta.logpdf(_THETA_GRID, 1, 4)
+
+# Severities are clipped away from 0 and 1, where the Beta likelihood is degenerate.
+_SEVERITY_EPS = 1e-6
+
+# Geopolitical categories in a fixed order, so each one can be referred to by index.
+_CATEGORIES: List[GeopoliticalRiskCategory] = list(GeopoliticalRiskCategory)
+
+# Lowercased family name -> category index, for O(1) matching of event families.
+_FAMILY_LUT: Dict[str, int] = {
+    GEOPOLITICAL_CATEGORY_LOWER[cat]: i for i, cat in enumerate(_CATEGORIES)
+}
+
+
+def _posterior_mean(severities: np.ndarray, kappa: float) -> float:
+    """
+    Computes the posterior mean for theta using a Bayesian Beta model:
+    - Prior: Beta(1, 4) → mean of 0.2 (pessimistic prior)
+    - Observations: Modeled as Beta(kappa * theta, kappa * (1 - theta))
+
+    The posterior is evaluated in log space on a fixed theta grid and
+    integrated with the trapezoidal rule, which is deterministic and
+    avoids running an MCMC sampler.
+    """
+    s = np.clip(np.asarray(severities, dtype=float), _SEVERITY_EPS, 1 - _SEVERITY_EPS)
+
+    # Log-likelihood of all observations for every theta on the grid, from the Beta
+    # distribution's sufficient statistics (sum of log s and of log(1 - s)):
+    # (a - 1) * sum(log s) + (b - 1) * sum(log(1 - s)) - N * betaln(a, b),
+    # so time and memory are O(grid) whatever the number of observations.
+    a = kappa * _THETA_GRID
+    b = kappa * (1 - _THETA_GRID)
+    log_likelihood = (a - 1) * np.log(s).sum() + (b - 1) * np.log1p(-s).sum() - s.size * betaln(a, b)
+    log_posterior = _LOG_PRIOR + log_likelihood
+
+    # Subtract the maximum before exponentiating to avoid underflow.
+    weights = np.exp(log_posterior - log_posterior.max())
+    return float(trapezoid(_THETA_GRID * weights, _THETA_GRID) / trapezoid(weights, _THETA_GRID))
+
+
 class BayesianRiskAssessmentService:
     """
     Service that computes Bayesian-based risk scores for geopolitical categories,
@@ -41,12 +87,9 @@ class BayesianRiskAssessmentService:
                  geopolitical subcategory.
         """
 
-        # Dictionary to hold severities for each geopolitical category.
-        category_severities: Dict[GeopoliticalRiskCategory, List[float]] = {
-            cat: [] for cat in GeopoliticalRiskCategory
-        }
-
-        # Gather severity values by category from relevant events.
+        # Flatten (category, severity) observations from relevant events into two parallel lists.
+        cat_ids: List[int] = []
+        sevs: List[float] = []
         for e in events:
             if (
                     not e.risk_assessment or
@@ -61,39 +104,32 @@ class BayesianRiskAssessmentService:
 
             # Scan the event's risk_categories for "Geopolitical" and match subcategories.
             for rcat in e.risk_categories:
-                if rcat.class_name.lower() == "geopolitical" and rcat.families:
+                if rcat.families and rcat.class_name.lower() == "geopolitical":
                     for family in rcat.families:
-                        for cat_enum in GeopoliticalRiskCategory:
-                            if family.lower() == cat_enum.value.lower():
-                                category_severities[cat_enum].append(normalized_severity)
-                                break
-
-        def _posterior_mean(severities: List[float]) -> float:
-            """
-            Computes the posterior mean for theta using a Bayesian Beta model:
-            - Prior: Beta(1, 4) → mean of 0.2 (pessimistic prior)
-            - Observations: Modeled as Beta(kappa * theta, kappa * (1 - theta))
-            """
-            with pm.Model() as model:
-                # Define prior
-                theta = pm.Beta("theta", alpha=1, beta=4)
-
-                # Likelihood based on observed severity scores
-                pm.Beta("s_obs", alpha=kappa * theta, beta=kappa * (1 - theta), observed=severities)
-
-                # Sample from posterior
-                trace = pm.sample(draws=1000, tune=500, chains=2, cores=1, progressbar=False)
-
-            # Return posterior mean of theta
-            return float(trace.posterior["theta"].mean().item())
-
-        # Compute risk scores (posterior means) for each category.
-        scores_dict: Dict[GeopoliticalRiskCategory, float] = {}
-        for cat_enum, severities_list in category_severities.items():
-            if not severities_list:
-                scores_dict[cat_enum] = default_no_data_score
-            else:
-                scores_dict[cat_enum] = _posterior_mean(severities_list)
+                        cat_id = _FAMILY_LUT.get(family.lower())
+                        if cat_id is not None:
+                            cat_ids.append(cat_id)
+                            sevs.append(normalized_severity)
+
+        # Group the severities by category: one stable sort by category index, then
+        # split the sorted array into contiguous per-category slices.
+        cat_id_array = np.asarray(cat_ids, dtype=np.int8)
+        sev_array = np.asarray(sevs, dtype=float)
+        order = np.argsort(cat_id_array, kind="stable")
+        counts = np.bincount(cat_id_array, minlength=len(_CATEGORIES))
+        category_severities: Dict[GeopoliticalRiskCategory, np.ndarray] = dict(
+            zip(_CATEGORIES, np.split(sev_array[order], np.cumsum(counts)[:-1]))
+        )
+
+        # Compute risk scores (posterior means) for each category with observations.
+        posterior_means = {
+            cat: _posterior_mean(sev, kappa) for cat, sev in category_severities.items() if sev.size
+        }
+
+        scores_dict: Dict[GeopoliticalRiskCategory, float] = {
+            cat_enum: posterior_means.get(cat_enum, default_no_data_score)
+            for cat_enum in _CATEGORIES
+        }
 
         # Construct and return the RiskScore model.
         return RiskScore(
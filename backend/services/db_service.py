@@ -1,94 +1,372 @@
-from typing import List, Optional
-from tinydb import TinyDB, Query
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+import orjson
+
 from backend.models.models import RiskScore, Event
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS supply_chains (
+    id TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    supply_chain_id TEXT,
+    is_assessed INTEGER NOT NULL DEFAULT 0,
+    is_relevant INTEGER NOT NULL DEFAULT 0,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_assessed ON events (is_assessed);
+CREATE INDEX IF NOT EXISTS idx_events_sc_relevant ON events (supply_chain_id, is_relevant);
+CREATE TABLE IF NOT EXISTS risk_scores (
+    supply_chain_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS backfill_jobs (
+    id TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS news_cache (
+    key TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    etag TEXT,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value BLOB
+);
+"""
+
+# Upserts keep the existing rowid so that rows stay in insertion order.
+UPSERT_EVENT = """
+INSERT INTO events (id, supply_chain_id, is_assessed, is_relevant, data) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    supply_chain_id = excluded.supply_chain_id,
+    is_assessed = excluded.is_assessed,
+    is_relevant = excluded.is_relevant,
+    data = excluded.data
+"""
+
+# Inserts events that are not stored yet and leaves stored ones (and their assessments) untouched.
+INSERT_NEW_EVENT = """
+INSERT INTO events (id, supply_chain_id, is_assessed, is_relevant, data) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(id) DO NOTHING
+"""
+
+
+# How long rarely-changing reads (selected supply chain, supply chains, risk scores) are cached.
+CACHE_TTL_SECONDS = 1.0
+
+
+def _dumps(record: dict) -> bytes:
+    return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _event_row(record: dict) -> tuple:
+    risk_assessment = record.get("risk_assessment")
+    return (
+        record["id"],
+        record.get("supply_chain_id"),
+        int(risk_assessment is not None),
+        int(bool(risk_assessment and risk_assessment.get("is_relevant"))),
+        _dumps(record)
+    )
+
 
 class DBService:
-    def __init__(self, db_name="database.json"):
-        self.db_path = Path(__file__).resolve().parent.parent / "data" / db_name
-        self.db = TinyDB(self.db_path)
-        self.supply_chain_table = self.db.table("supply_chains")
-        self.event_table = self.db.table("events")
-        self.risk_score_table = self.db.table("risk_scores")
-        self.settings_table = self.db.table("settings")
+    def __init__(self, db_name="database.db", legacy_db_name="database.json"):
+        data_dir = Path(__file__).resolve().parent.parent / "data"
+        self.db_path = data_dir / db_name
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+        self._import_legacy_db(data_dir / legacy_db_name)
+
+    def _import_legacy_db(self, legacy_path: Path):
+        """Seed a new database once from the TinyDB JSON file used by earlier versions."""
+        with self.lock:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+                return
+            legacy = {}
+            if legacy_path.exists():
+                legacy = orjson.loads(legacy_path.read_bytes())
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO supply_chains (id, data) VALUES (?, ?)",
+                    [(r["id"], _dumps(r)) for r in legacy.get("supply_chains", {}).values()]
+                )
+                # Round-trip legacy events through the model so stored blobs have every field.
+                self.conn.executemany(
+                    UPSERT_EVENT,
+                    [_event_row(Event(**r).model_dump()) for r in legacy.get("events", {}).values()]
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO risk_scores (supply_chain_id, data) VALUES (?, ?)",
+                    [(r["supply_chain_id"], _dumps(r)) for r in legacy.get("risk_scores", {}).values()]
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+                    [(r["key"], _dumps(r["value"])) for r in legacy.get("settings", {}).values()]
+                )
+                self.conn.execute("PRAGMA user_version = 1")
+
+    def _fetch_all(self, sql: str, params: tuple = ()) -> list:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _fetch_one(self, sql: str, params: tuple = ()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self.lock, self.conn:
+            self.conn.execute(sql, params)
+
+    def _cached(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """Return a cached value for key, reloading it once it is older than CACHE_TTL_SECONDS."""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and now < entry[0]:
+            return entry[1]
+        value = loader()
+        self._cache[key] = (now + CACHE_TTL_SECONDS, value)
+        return value
+
+    def _invalidate(self, key: Tuple):
+        self._cache.pop(key, None)
+
+    def data_version(self) -> int:
+        """
+        Number of rows written through this service's connection so far; changes whenever stored data
+        does, as long as every writer shares this DBService instance.
+        """
+        # A counter read, which SQLite serializes itself, so it does not wait for the lock held by writes.
+        return self.conn.total_changes
 
     # Supply chain
     def add_supply_chain(self, supply_chain):
-        self.supply_chain_table.upsert(supply_chain, Query().id == supply_chain["id"])
+        self._execute(
+            "INSERT INTO supply_chains (id, data) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+            (supply_chain["id"], _dumps(supply_chain))
+        )
+        self._invalidate(("supply_chain", supply_chain["id"]))
+        self._invalidate(("supply_chains_raw",))
 
     def get_supply_chain(self, supply_chain_id):
-        return self.supply_chain_table.get(Query().id == supply_chain_id)
+        def load():
+            row = self._fetch_one("SELECT data FROM supply_chains WHERE id = ?", (supply_chain_id,))
+            return orjson.loads(row[0]) if row else None
+
+        return self._cached(("supply_chain", supply_chain_id), load)
 
     def get_all_supply_chains(self):
-        return self.supply_chain_table.all()
+        return [orjson.loads(data) for data in self.get_all_supply_chains_raw()]
+
+    def get_all_supply_chains_raw(self) -> List[bytes]:
+        """Return the stored JSON of every supply chain without decoding it."""
+        return self._cached(
+            ("supply_chains_raw",),
+            lambda: [row[0] for row in self._fetch_all("SELECT data FROM supply_chains ORDER BY rowid")]
+        )
 
     def save_selected_supply_chain(self, supply_chain_id):
-        self.settings_table.upsert(
-            {"key": "selected_supply_chain", "value": supply_chain_id},
-            Query().key == "selected_supply_chain"
+        self._execute(
+            "INSERT INTO settings (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            ("selected_supply_chain", _dumps(supply_chain_id))
         )
+        self._invalidate(("selected_supply_chain",))
 
     def get_selected_supply_chain(self) -> Optional[str]:
-        setting = self.settings_table.get(Query().key == "selected_supply_chain")
-        return setting["value"] if setting else None
+        def load():
+            row = self._fetch_one("SELECT value FROM settings WHERE key = ?", ("selected_supply_chain",))
+            return orjson.loads(row[0]) if row else None
+
+        return self._cached(("selected_supply_chain",), load)
 
     # Event Storage
     def save_events(self, events: List[Event]):
-        for event in events:
-            self.event_table.upsert(event.dict(), Query().id == event.id)
+        """Upsert events in a single transaction, dumping each model once; non-events are not stored."""
+        rows = [_event_row(event.model_dump()) for event in events if event.is_event]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany(UPSERT_EVENT, rows)
+
+    def insert_new_events(self, events: List[Event]):
+        """Like save_events, but events whose ID is already stored are skipped rather than overwritten."""
+        rows = [_event_row(event.model_dump()) for event in events if event.is_event]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany(INSERT_NEW_EVENT, rows)
 
     def get_all_events(self) -> List[Event]:
-        return [Event(**record) for record in self.event_table.all()]
+        return [Event.model_validate_json(row[0]) for row in self._fetch_all("SELECT data FROM events ORDER BY rowid")]
+
+    def _iter_event_blobs(self, where: str, params: tuple = (), batch_size: int = 500) -> Iterator[bytes]:
+        """Yield stored event JSON in rowid order, fetching one batch at a time."""
+        last_rowid = 0
+        while True:
+            rows = self._fetch_all(
+                f"SELECT rowid, data FROM events WHERE rowid > ? AND {where} ORDER BY rowid LIMIT ?",
+                (last_rowid, *params, batch_size)
+            )
+            for _, data in rows:
+                yield data
+            if len(rows) < batch_size:
+                return
+            last_rowid = rows[-1][0]
+
+    def iter_all_events_raw(self) -> Iterator[bytes]:
+        return self._iter_event_blobs("1")
 
     def get_event_by_id(self, event_id: str) -> Optional[Event]:
-        record = self.event_table.get(Query().id == event_id)
-        return Event(**record) if record else None
+        row = self._fetch_one("SELECT data FROM events WHERE id = ?", (event_id,))
+        return Event.model_validate_json(row[0]) if row else None
+
+    def get_events_by_ids(self, event_ids: List[str]) -> Dict[str, Event]:
+        """Return the stored events among event_ids, keyed by ID."""
+        events = {}
+        ids = list(dict.fromkeys(event_id for event_id in event_ids if event_id))
+        # Stay well below SQLite's limit on bound parameters
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            rows = self._fetch_all(
+                f"SELECT id, data FROM events WHERE id IN ({', '.join('?' * len(chunk))})", tuple(chunk)
+            )
+            for event_id, data in rows:
+                events[event_id] = Event.model_validate_json(data)
+        return events
+
+    def event_exists(self, event_id: str) -> bool:
+        return self._fetch_one("SELECT 1 FROM events WHERE id = ?", (event_id,)) is not None
 
     def delete_all_events(self):
-        self.event_table.truncate()
+        self._execute("DELETE FROM events")
 
     def get_unassessed_events(self) -> List[Event]:
         return [
-            Event(**record)
-            for record in self.event_table.search(Query().risk_assessment == None)
+            Event.model_validate_json(row[0])
+            for row in self._fetch_all("SELECT data FROM events WHERE is_assessed = 0 ORDER BY rowid")
         ]
 
     def get_assessed_events(self, supply_chain_id: str) -> List[Event]:
         """Retrieve only events that have been assessed for a given supply chain
         and are marked as relevant (i.e., risk_assessment.is_relevant is True)."""
         return [
-            Event(**record)
-            for record in self.event_table.search(
-                (Query().supply_chain_id == supply_chain_id) &
-                (Query().risk_assessment != None) &
-                (Query().risk_assessment.is_relevant == True)
+            Event.model_validate_json(row[0])
+            for row in self._fetch_all(
+                "SELECT data FROM events WHERE supply_chain_id = ? AND is_relevant = 1 ORDER BY rowid",
+                (supply_chain_id,)
             )
         ]
 
+    def iter_assessed_events_raw(self, supply_chain_id: str) -> Iterator[bytes]:
+        """Like get_assessed_events, but yields each event's stored JSON without building models."""
+        return self._iter_event_blobs("supply_chain_id = ? AND is_relevant = 1", (supply_chain_id,))
+
     def save_event_assessment(self, event: Event):
-        self.event_table.upsert(event.dict(), Query().id == event.id)
+        self._execute(UPSERT_EVENT, _event_row(event.model_dump()))
 
     def delete_event(self, event_id: str):
-        self.event_table.remove(Query().id == event_id)
+        self._execute("DELETE FROM events WHERE id = ?", (event_id,))
 
     def reset_all_event_assessments(self):
-        self.event_table.update({"risk_assessment": None})
+        with self.lock, self.conn:
+            rows = self.conn.execute("SELECT id, data FROM events").fetchall()
+            updates = []
+            for event_id, data in rows:
+                record = orjson.loads(data)
+                record["risk_assessment"] = None
+                updates.append((_dumps(record), event_id))
+            self.conn.executemany(
+                "UPDATE events SET is_assessed = 0, is_relevant = 0, data = ? WHERE id = ?", updates
+            )
+
+    # NewsAPI Cache
+    def get_news_page(self, key: str) -> Optional[Tuple[float, Optional[str], bytes]]:
+        """Return (fetched_at, etag, articles JSON) of a cached NewsAPI response."""
+        return self._fetch_one("SELECT fetched_at, etag, data FROM news_cache WHERE key = ?", (key,))
+
+    def save_news_page(self, key: str, etag: Optional[str], data: bytes):
+        self._execute(
+            "INSERT INTO news_cache (key, fetched_at, etag, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET fetched_at = excluded.fetched_at, etag = excluded.etag, data = excluded.data",
+            (key, time.time(), etag, data)
+        )
+
+    def touch_news_page(self, key: str):
+        self._execute("UPDATE news_cache SET fetched_at = ? WHERE key = ?", (time.time(), key))
+
+    # Backfill Jobs
+    def save_backfill_job(self, job: dict):
+        self._execute(
+            "INSERT INTO backfill_jobs (id, data) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+            (job["id"], _dumps(job))
+        )
+
+    def get_backfill_job(self, job_id: str) -> Optional[dict]:
+        row = self._fetch_one("SELECT data FROM backfill_jobs WHERE id = ?", (job_id,))
+        return orjson.loads(row[0]) if row else None
+
+    def claim_backfill_job(self, job_id: str, status: str, new_status: str) -> bool:
+        """
+        Move a stored job from status to new_status. The update is conditional on the row read, so
+        of several concurrent callers (in this or another process) only one claims the job.
+        """
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT data FROM backfill_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return False
+            job = orjson.loads(row[0])
+            if job.get("status") != status:
+                return False
+            job["status"] = new_status
+            cursor = self.conn.execute(
+                "UPDATE backfill_jobs SET data = ? WHERE id = ? AND data = ?", (_dumps(job), job_id, row[0])
+            )
+            return cursor.rowcount == 1
 
     # Risk Scores
     def add_or_update_risk_score(self, risk_score: RiskScore):
-        self.risk_score_table.upsert(
-            risk_score.dict(),
-            Query().supply_chain_id == risk_score.supply_chain_id
+        self._execute(
+            "INSERT INTO risk_scores (supply_chain_id, data) VALUES (?, ?) "
+            "ON CONFLICT(supply_chain_id) DO UPDATE SET data = excluded.data",
+            (risk_score.supply_chain_id, _dumps(risk_score.model_dump()))
         )
+        self._invalidate(("risk_score", risk_score.supply_chain_id))
+        self._invalidate(("risk_score_raw", risk_score.supply_chain_id))
 
     def get_risk_score(self, supply_chain_id: str) -> Optional[RiskScore]:
-        record = self.risk_score_table.get(Query().supply_chain_id == supply_chain_id)
-        return RiskScore(**record) if record else None
+        def load():
+            row = self._fetch_one("SELECT data FROM risk_scores WHERE supply_chain_id = ?", (supply_chain_id,))
+            return RiskScore.model_validate_json(row[0]) if row else None
+
+        return self._cached(("risk_score", supply_chain_id), load)
+
+    def get_risk_score_raw(self, supply_chain_id: str) -> Optional[bytes]:
+        """Return the stored JSON of a risk score without validating it."""
+        def load():
+            row = self._fetch_one("SELECT data FROM risk_scores WHERE supply_chain_id = ?", (supply_chain_id,))
+            return row[0] if row else None
+
+        return self._cached(("risk_score_raw", supply_chain_id), load)
 
     def get_all_risk_scores(self) -> List[RiskScore]:
-        return [RiskScore(**record) for record in self.risk_score_table.all()]
+        return [RiskScore.model_validate_json(row[0]) for row in self._fetch_all("SELECT data FROM risk_scores ORDER BY rowid")]
 
     def delete_risk_score(self, supply_chain_id: str):
-        self.risk_score_table.remove(Query().supply_chain_id == supply_chain_id)
+        self._execute("DELETE FROM risk_scores WHERE supply_chain_id = ?", (supply_chain_id,))
+        self._invalidate(("risk_score", supply_chain_id))
+        self._invalidate(("risk_score_raw", supply_chain_id))
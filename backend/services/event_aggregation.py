@@ -0,0 +1,43 @@
+import math
+from bisect import bisect_right
+from collections import Counter
+from typing import Iterable
+
+import orjson
+
+# Upper bounds (exclusive) of each normalized risk score level, and the level labels, as shown on the dashboard.
+# Mirrors frontend/components/risk_levels.py (tests/test_risk_levels.py checks the two match).
+RISK_LEVEL_THRESHOLDS = (0.10, 0.30, 0.55, 0.75)
+RISK_LEVELS = ("Very Low Risk", "Low Risk", "Medium Risk", "High Risk", "Extreme Risk")
+
+
+def aggregate_events(records: Iterable[bytes]) -> dict:
+    """
+    Summarize stored event JSON into the counts the dashboard charts are drawn from:
+      - total_events: number of events,
+      - by_level: events per risk level of their risk score (events without a score are not counted),
+      - by_class: risks per risk class name,
+      - subcategory_counts: risks per risk family.
+    """
+    total_events = 0
+    by_level = Counter()
+    by_class = Counter()
+    subcategory_counts = Counter()
+    for raw in records:
+        event = orjson.loads(raw)
+        total_events += 1
+        score = (event.get("risk_assessment") or {}).get("risk_score")
+        if isinstance(score, (int, float)) and not math.isnan(score):
+            by_level[RISK_LEVELS[bisect_right(RISK_LEVEL_THRESHOLDS, score)]] += 1
+        for risk in event.get("risk_categories") or ():
+            by_class[risk.get("class_name") or ""] += 1
+            for family in risk.get("families") or ():
+                family = family.strip()
+                if family:
+                    subcategory_counts[family] += 1
+    return {
+        "total_events": total_events,
+        "by_level": dict(by_level),
+        "by_class": dict(by_class),
+        "subcategory_counts": dict(subcategory_counts),
+    }
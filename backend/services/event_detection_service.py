@@ -1,24 +1,347 @@
+import asyncio
+import hashlib
+import logging
 import os
-import requests
-from typing import List
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
 
-from pydantic import BaseModel
+import httpx
+import orjson
+from pydantic import BaseModel, ValidationError
 
 from backend.models.models import Event, Location, Risk
 from backend.services.db_service import DBService
 from backend.services.gpt_service import GPTService
+from backend.services.local_geocoder import LocalGeocoder
+from backend.services.local_risk_classifier import LocalRiskClassifier
+from backend.services.event_text_cache import EventTextCache
+
+logger = logging.getLogger(__name__)
+
+GPT_MODEL = "gpt-4o-mini"
+
+# Articles/events are sent to GPT in batches of this size, one request per batch.
+BATCH_SIZE = 10
+# Maximum number of batch requests in flight at once, to stay within OpenAI rate limits.
+MAX_CONCURRENT_BATCHES = 5
+
+# NewsAPI requests are retried on these statuses with exponential backoff.
+NEWS_API_RETRY_STATUSES = {429, 500, 502, 503, 504}
+NEWS_API_MAX_RETRIES = 3
+NEWS_API_BACKOFF_SECONDS = 0.3
+NEWS_API_MAX_PAGE_SIZE = 100
+# Identical NewsAPI requests are answered from the database cache for this long, then revalidated.
+NEWS_CACHE_TTL_SECONDS = 60 * 60
+
+
+# Static prompt text lives at module level so that each request starts with the same bytes;
+# the per-request article/event text always comes last, which lets OpenAI prompt caching reuse the prefix.
+_EXTRACTION_SYSTEM_PROMPT = (
+    "You are an expert supply chain analyst. Your task is to determine if a news article "
+    "describes an event that could impact supply chains. Events might include floods, law changes, "
+    "strikes, cyberattacks, or other disruptions.\n\n"
+    "Rules:\n"
+    "1. An event is a specific occurrence or development that has a potential impact on supply chains. "
+    "   General observations, industry overviews, or speculative pieces are not considered events.\n"
+    "2. If the article does not describe an event, respond with: {\"is_event\": false}.\n"
+    "3. If the article describes an event, extract:\n"
+    "   - A concise title summarizing the event.\n"
+    "   - A detailed description of the event, including specific entities, locations, systems, and potential impacts.\n"
+    "   - Set `is_event` to true.\n\n"
+    "Output format according to schema, with the following fields relevant for this task:\n"
+    "{\n"
+    "  \"is_event\": true,\n"
+    "  \"title\": \"<Event Title>\",\n"
+    "  \"description\": \"<Event Description>\"\n"
+    "}\n\n"
+    "Examples:\n"
+    "1. **Valid Event**:\n"
+    "   Input:\n"
+    "   Article Title: \"Cybersecurity Risk to DNA Sequencers\"\n"
+    "   Article Content: \"Security vulnerabilities in DNA sequencing devices could disrupt crucial clinical research.\"\n"
+    "   Output:\n"
+    "   {\n"
+    "     \"is_event\": true,\n"
+    "     \"title\": \"Cybersecurity Vulnerabilities in DNA Sequencers\",\n"
+    "     \"description\": \"Security vulnerabilities have been found in the DNA sequencing devices iSeq 100, "
+    "     developed by manufacturer Illumina. The devices were found to be running an insecure BIOS implementation, "
+    "     exposing them to malware and ransomware attacks. These vulnerabilities could disrupt critical clinical research.\"\n"
+    "   }\n\n"
+    "2. **Not an Event**:\n"
+    "   Input:\n"
+    "   Article Title: \"China as the Sole Manufacturing Superpower\"\n"
+    "   Article Content: \"China is currently the world's sole manufacturing superpower, highlighting its production capabilities.\"\n"
+    "   Output:\n"
+    "   {\n"
+    "     \"is_event\": false\n"
+    "   }\n\n"
+    "You will receive several numbered articles. Apply these rules to each article independently and "
+    "return one item per article in `items`, with `index` set to the article's number. "
+    "For articles that are not events, set `title` and `description` to null.\n"
+)
+
+_RISK_SYSTEM_PROMPT = (
+    "You are an expert risk analyst. Your task is to classify events into risk categories based on "
+    "the Cambridge Risk Taxonomy.\n\n"
+    "The taxonomy has three levels:\n"
+    "- Class: Broadest category (e.g., Geopolitical, Environmental).\n"
+    "- Family: Subcategories within each class.\n"
+    "- Type: Specific examples to guide your classification.\n\n"
+    "Rules for classification:\n"
+    "1. Always assign at least one class to every event.\n"
+    "2. Assign families only when they are relevant. If no family fits well, leave the class unaccompanied.\n"
+    "3. If multiple families fit well within a class, you may assign more than one. However, choose only those that are highly relevant.\n"
+    "4. Use the types as context to guide your decisions but do not include them in the output.\n\n"
+    "Output format:\n"
+    "- One item per event in `items`, with `index` set to the event's number and `risks` holding "
+    "a list of Risk objects, each with:\n"
+    "  - `class_name`: The main risk category.\n"
+    "  - `families`: An optional array of subcategories.\n"
+)
+
+_RISK_TAXONOMY_PREFIX = (
+    "Classify each of the following events into one or more risk categories using the Cambridge Risk Taxonomy.\n\n"
+    "The taxonomy includes the following classes and families:\n\n"
+    "1. Financial:\n"
+    "   - Economic Outlook:\n"
+    "     - Recession, Stagnation, Contraction, Credit Crisis, Steady Growth, Expansion, Acceleration, Peak\n"
+    "   - Economic Variables:\n"
+    "     - Commodity Price Fluctuation, Inflation, Interest Rates\n"
+    "   - Market Crisis:\n"
+    "     - Asset Bubble, Bank Run, Sovereign Debt Crisis, Flash Crash, Fraudulent Market Manipulation, Cryptocurrency Failure, Reserve Currency Shift\n"
+    "   - Trading Environment:\n"
+    "     - Tariff Dispute, Cartel Manipulates Market, Organised Crime\n"
+    "   - Company Outlook:\n"
+    "     - Hostile Takeover, Credit Rating Downgrade, Investor Negative Outlook\n"
+    "   - Competition:\n"
+    "     - Disruptive Competitor, Aggressive Competitor, Fraudulent Competitor, Intellectual Property Theft\n"
+    "   - Counterparty:\n"
+    "     - Supplier Failure, Customer Failure, Government Failure, Creditor Failure, Counterparty Fraud\n\n"
+    "2. Geopolitical:\n"
+    "   - Business Environment (Country Risk):\n"
+    "     - Talent Availability, Industrial Action, Minimum Wage Hike, Sanctions, Territorial Disputes, Logistics Restrictions\n"
+    "   - Corruption & Crime:\n"
+    "     - Corruption Deterioration, Crime Wave/Piracy Increase, Slavery Practices\n"
+    "   - Government Business Policy:\n"
+    "     - Emerging Regulation, Corporation Tax Rate Hike, Diverted Profits Tax, Nationalisation, Confiscation of Assets, Privatisation, License Revocation\n"
+    "   - Change in Government:\n"
+    "     - Nationalism/Protectionism, Left-Wing Radicalism, Right-Wing Radicalism, Populism, Environmentalism\n"
+    "   - Political Violence:\n"
+    "     - Social Unrest, Terrorism, Subnational Conflict & Civil War, Coup d’État\n"
+    "   - Interstate Conflict:\n"
+    "     - Conventional Military War, Asymmetric War, Nuclear War, Cold War\n\n"
+    "3. Technology:\n"
+    "   - Disruptive Technology:\n"
+    "     - E-Commerce, Gig Economy, Artificial Intelligence, 5G Technology, Blockchain, Robotics & Automation, Augmented/Virtual Reality, Cryptocurrency, Autonomous Vehicles, Drones, Medical Advances\n"
+    "   - Cyber:\n"
+    "     - Data Exfiltration, Contagious Malware, Cloud Outage, Financial Theft, Distributed Denial of Service, Internet of Things, Industrial Control Systems, Internet Failure\n"
+    "   - Critical Infrastructure:\n"
+    "     - Power, Transport, Telecommunications, Satellite Systems, Water & Waste, Fuel, Gas\n"
+    "   - Industrial Accident:\n"
+    "     - Fire, Explosion, Pollution, Structural Failure, Nuclear\n\n"
+    "4. Environmental:\n"
+    "   - Extreme Weather:\n"
+    "     - Flood, Tropical Windstorm, Temperate Windstorm, Drought, Freeze, Heatwave, Wildfire\n"
+    "   - Geophysical:\n"
+    "     - Earthquake, Volcanic Eruption, Tsunami\n"
+    "   - Space:\n"
+    "     - Solar Storm, Astronomical Impact Event\n"
+    "   - Climate Change:\n"
+    "     - Physical, Liability, Transition, Increase in Extreme Weather, Sea Level Rise, Ocean Acidification, Lower Carbon Economy\n"
+    "   - Environmental Degradation:\n"
+    "     - Waste & Pollution, Biodiversity Loss, Ecosystem Collapse, Deforestation, Soil Degradation\n"
+    "   - Natural Resource Deficiency:\n"
+    "     - Fossil Fuels, Biogeochemicals, Raw Materials, Water\n"
+    "   - Food Security:\n"
+    "     - Animal Epidemic, Plant Epidemic, Famine\n\n"
+    "5. Social:\n"
+    "   - Socioeconomic Trends:\n"
+    "     - Ageing Population, Gender Imbalance, Wealth Inequality, Poor Educational Standards, Migration\n"
+    "   - Human Capital:\n"
+    "     - Failure to Attract Talent, Gender & Diversity, Labour Disputes & Strikes, Loss of Key Personnel, Employee Misconduct\n"
+    "   - Brand Perception:\n"
+    "     - Fake News, Negative Media Coverage, Key Influencer Disruption, Negative Customer Experience\n"
+    "   - Sustainable Living:\n"
+    "     - Consumer Activism, Sustainable Purchasing, Supply Chain Provenance, Diet\n"
+    "   - Health Trends:\n"
+    "     - Obesity, Longevity, Antimicrobial Resistance, Medical Breakthroughs, Healthcare, Social Care\n"
+    "   - Infectious Disease:\n"
+    "     - Influenza Pandemics, Coronavirus-like Epidemics, Viral Hemorrhagic Fevers, Preventable Disease Outbreaks, Unknown Emergent Diseases\n\n"
+    "6. Governance:\n"
+    "   - Non-Compliance:\n"
+    "     - Emerging Regulation, Internal Corruption & Fraud, Negligence, Revised Accounting Standards, Occupational Health & Safety\n"
+    "   - Litigation:\n"
+    "     - Private Lawsuit, Mass Tort, Class Action\n"
+    "   - Strategic Performance:\n"
+    "     - Divestitures, Joint Ventures, Mergers & Acquisitions, Restructuring, Poor Investment\n"
+    "   - Management Performance:\n"
+    "     - Executive Mismanagement, Ineffective Board, Management Execution Failure\n"
+    "   - Business Model Deficiencies:\n"
+    "     - Technology, Customer Preference Change\n"
+    "   - Pension Management:\n"
+    "     - Contribution Management, Fund Management\n"
+    "   - Products & Services:\n"
+    "     - Product Defect/Failure, Innovation (R&D) Failure\n\n"
+    "Return the risks of each event as a list of Risk objects in this format:\n"
+    "[\n"
+    "  {\"class_name\": \"Geopolitical\", \"families\": [\"Corruption & Crime\", \"Political Violence\"]},\n"
+    "  {\"class_name\": \"Social\", \"families\": [\"Socioeconomic Trends\"]}\n"
+    "]\n\n"
+    "Events:\n"
+)
+
+_LOCATION_SYSTEM_PROMPT = (
+    "You are an expert supply chain analyst. Your task is to determine the most relevant location "
+    "for an event based on its description and title, focusing on its impact on supply chains. "
+    "Consider how and where the event could disrupt supply chain operations.\n\n"
+    "Rules:\n"
+    "1. Assign a location only if it is clearly relevant to the supply chain impact of the event.\n"
+    "   - This could be the location where the event occurs, or where its effects are most significant.\n"
+    "2. If the event affects multiple countries or an entire region, use `geographic_scope` to indicate "
+    "this broader impact (e.g., 'Global', 'Asia', 'Europe').\n"
+    "3. Provide the most relevant level of detail (country, region, city) without being overly specific.\n"
+    "4. If no specific location can be determined, set the location to a broad `geographic_scope` (e.g., 'Global').\n\n"
+    "Output format:\n"
+    "{\n"
+    "  \"geographic_scope\": \"<Global or Continent>\",\n"
+    "  \"country\": \"<Country>\",\n"
+    "  \"region\": \"<Region>\",\n"
+    "  \"city\": \"<City>\",\n"
+    "  \"coordinates\": [<Latitude>, <Longitude>]\n"
+    "}\n"
+    "If no specific location is relevant, return:\n"
+    "{\n"
+    "  \"geographic_scope\": \"Global\",\n"
+    "  \"country\": null,\n"
+    "  \"region\": null,\n"
+    "  \"city\": null,\n"
+    "  \"coordinates\": null\n"
+    "}\n\n"
+    "Examples:\n"
+    "1. **Specific Location**:\n"
+    "   Event Title: \"China's Tightened Export Controls Impact Apple Supply Chain\"\n"
+    "   Event Description: \"Apple's efforts to diversify its supply chain are being hindered by tightened export "
+    "   controls imposed by China. The restrictions are affecting manufacturing processes and may lead to delays.\"\n"
+    "   Output:\n"
+    "   {\n"
+    "     \"geographic_scope\": null,\n"
+    "     \"country\": \"China\",\n"
+    "     \"region\": null,\n"
+    "     \"city\": null,\n"
+    "     \"coordinates\": [35.8617, 104.1954]\n"
+    "   }\n\n"
+    "2. **Global Impact**:\n"
+    "   Event Title: \"Security Vulnerabilities in DNA Sequencers\"\n"
+    "   Event Description: \"Eclypsium, an Argentine cybersecurity firm, has reported that leading DNA sequencing "
+    "   devices are running on outdated firmware, making them vulnerable to takeovers and disruptions. "
+    "   This could affect clinical research globally.\"\n"
+    "   Output:\n"
+    "   {\n"
+    "     \"geographic_scope\": \"Global\",\n"
+    "     \"country\": null,\n"
+    "     \"region\": null,\n"
+    "     \"city\": null,\n"
+    "     \"coordinates\": null\n"
+    "   }\n\n"
+    "3. **Region-Specific Impact**:\n"
+    "   Event Title: \"Floods Disrupt Logistics in Southeast Asia\"\n"
+    "   Event Description: \"Severe flooding in Southeast Asia has disrupted major shipping routes, delaying "
+    "   goods bound for global markets.\"\n"
+    "   Output:\n"
+    "   {\n"
+    "     \"geographic_scope\": \"Asia\",\n"
+    "     \"country\": null,\n"
+    "     \"region\": \"Southeast Asia\",\n"
+    "     \"city\": null,\n"
+    "     \"coordinates\": null\n"
+    "   }\n\n"
+    "You will receive several numbered events. Apply these rules to each event independently and "
+    "return one item per event in `items`, with `index` set to the event's number.\n"
+)
+
+
+class ArticleEvent(BaseModel):
+    index: int  # Position of the article within the batch
+    is_event: bool
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+
+class ArticleEventBatch(BaseModel):
+    items: List[ArticleEvent]
+
+
+class EventRisks(BaseModel):
+    index: int  # Position of the event within the batch
+    risks: List[Risk]
+
+
+class EventRisksBatch(BaseModel):
+    items: List[EventRisks]
+
+
+class EventLocation(BaseModel):
+    index: int  # Position of the event within the batch
+    location: Location
+
+
+class EventLocationBatch(BaseModel):
+    items: List[EventLocation]
+
+
+# Response schema of each kind of Batch API request, keyed by the custom_id prefix.
+_BACKFILL_SCHEMAS = {"extract": ArticleEventBatch, "risks": EventRisksBatch, "location": EventLocationBatch}
+_BACKFILL_FAILED_STATUSES = {"failed", "expired", "cancelled"}
+
+
+def _backfill_schema(custom_id: str):
+    return _BACKFILL_SCHEMAS[custom_id.split("-", 1)[0]]
+
+
+def _chunks(items: list) -> List[list]:
+    return [items[offset:offset + BATCH_SIZE] for offset in range(0, len(items), BATCH_SIZE)]
+
+
+def _backfill_summary(job: dict) -> dict:
+    return {key: job.get(key) for key in ("id", "status", "article_count", "event_count", "error")}
+
+
+def _article_fingerprint(article: dict) -> bytes:
+    """Hash of the normalised title and start of the description, shared by syndicated copies."""
+    text = f"{(article.get('title') or '').lower().strip()}|{(article.get('description') or '')[:200]}"
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _event_text(event: Event) -> str:
+    return f"{event.title} {event.description}"
+
+
+def _items_by_index(response, schema) -> dict:
+    """Map batch items to their index; a failed call (not an instance of schema) yields no items."""
+    return {item.index: item for item in response.items} if isinstance(response, schema) else {}
 
 
 class EventDetectionService:
-    def __init__(self):
-        self.db_service = DBService()
+    def __init__(self, db_service: Optional[DBService] = None):
+        # Pass the API's DBService so that event writes made here also change its data_version.
+        self.db_service = db_service or DBService()
         self.news_api_key = os.getenv("NEWS_API_KEY")
+        self._http_client = None
         self.gpt_service = GPTService()
-
-    def process_events(self, query: str, page_size: int = 10, from_date: str = None, to_date: str = None) -> List[Event]:
+        # Duplicate events (the same story from several outlets) reuse earlier classifications.
+        self.risk_cache = EventTextCache()
+        # Optional local zero-shot model; GPT classifies whatever it is unsure about.
+        self.local_risk_classifier = LocalRiskClassifier.from_env()
+        # Optional offline NER + gazetteer geocoding; GPT locates events it cannot resolve.
+        self.local_geocoder = LocalGeocoder.from_env()
+
+    async def process_events(self, query: str, page_size: int = 10, from_date: str = None,
+                             to_date: str = None) -> List[Event]:
         """
         Fetch, process, and store events: extract events from articles, assign risk categories,
-        and assign locations.
+        and assign locations. Articles are streamed from NewsAPI into a queue, and batches are
+        processed and saved while later pages are still being fetched.
 
         Parameters:
         - query: The full-text search query for fetching news articles.
@@ -27,368 +350,447 @@ class EventDetectionService:
         - to_date: (Optional) The latest publication date (YYYY-MM-DD).
 
         Returns:
-        - A list of Event objects.
+        - A list of Event objects, in article order.
         """
-        # Step 1: Fetch events from articles using the new parameters
-        events = self.fetch_news(query, page_size, from_date, to_date)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=BATCH_SIZE * MAX_CONCURRENT_BATCHES)
+
+        async def produce():
+            position = 0
+            async for article in self.iter_unique_news(query, page_size, from_date, to_date):
+                await queue.put((position, article))
+                position += 1
+            # One sentinel per consumer. On a fetch error the task group cancels the consumers instead.
+            for _ in range(MAX_CONCURRENT_BATCHES):
+                await queue.put(None)
+
+        async def consume() -> List[tuple]:
+            processed = []
+            done = False
+            while not done:
+                batch = []
+                while len(batch) < BATCH_SIZE:
+                    item = await queue.get()
+                    if item is None:
+                        done = True
+                        break
+                    batch.append(item)
+                if batch:
+                    processed.extend(await self._process_article_batch(batch))
+            return processed
+
+        # The first failing task cancels all the others, so a failed consumer cannot leave the
+        # producer blocked on the full queue (nor a failed producer leave consumers waiting on it).
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(produce())
+                consumers = [group.create_task(consume()) for _ in range(MAX_CONCURRENT_BATCHES)]
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0]
 
-        # Step 2: Assign risk categories and locations to each event
-        for event in events:
-            self.assign_risk_categories(event)
-            self.assign_location(event)
+        processed = sorted((item for task in consumers for item in task.result()), key=lambda item: item[0])
+        return [event for _, event in processed]
 
-        # Step 3: Save processed events to the database
-        self.db_service.save_events(events)
+    async def _process_article_batch(self, batch: List[tuple]) -> List[tuple]:
+        """
+        Extract, classify, locate and save the events of one batch of (position, article) pairs.
+        Articles already stored as events are returned from the database instead of reprocessed.
+        """
+        stored = await asyncio.to_thread(self.db_service.get_events_by_ids, [article.get("url") for _, article in batch])
+        processed = [(position, stored[article.get("url")]) for position, article in batch if article.get("url") in stored]
+        batch = [(position, article) for position, article in batch if article.get("url") not in stored]
+        if not batch:
+            return processed
+
+        extracted = await self._extract_events_batch([article for _, article in batch])
+        new = [(position, event) for (position, _), event in zip(batch, extracted) if event]
+        events = [event for _, event in new]
+        if events:
+            # Risk categories and locations are independent of each other
+            await asyncio.gather(self.assign_risk_categories(events), self.assign_location(events))
+            await asyncio.to_thread(self.db_service.save_events, events)
+        return processed + new
+
+    async def start_backfill(self, query: str, page_size: int = 100, from_date: str = None,
+                             to_date: str = None) -> dict:
+        """
+        Start a non-interactive backfill: fetch articles now and extract their events through the
+        OpenAI Batch API (completes within 24h at half price). Call advance_backfill to move the
+        job along; it classifies, locates and saves the new events in a second batch.
 
-        return events
+        Returns:
+        - A summary of the job (id, status, article_count, event_count, error).
+        """
+        articles = [article async for article in self.iter_unique_news(query, page_size, from_date, to_date)]
+        stored = await asyncio.to_thread(self.db_service.get_events_by_ids, [article.get("url") for article in articles])
+        articles = [article for article in articles if article.get("url") not in stored]
+        job = {"id": uuid.uuid4().hex, "status": "completed", "article_count": len(articles), "event_count": 0,
+               "error": None, "batch_id": None, "articles": articles, "events": []}
+        if articles:
+            requests = [
+                (f"extract-{n}", GPT_MODEL, self._extraction_messages(batch), ArticleEventBatch)
+                for n, batch in enumerate(_chunks(articles))
+            ]
+            job["batch_id"] = await asyncio.to_thread(self.gpt_service.submit_batch, requests)
+            job["status"] = "extracting"
+        await asyncio.to_thread(self.db_service.save_backfill_job, job)
+        return _backfill_summary(job)
+
+    async def advance_backfill(self, job_id: str) -> Optional[dict]:
+        """
+        Check the job's current OpenAI batch and, once it has completed, process its results and
+        start the next stage. Returns a summary of the job, or None if there is no such job.
+        """
+        job = await asyncio.to_thread(self.db_service.get_backfill_job, job_id)
+        if job is None or job["status"] in ("completed", "failed", "processing"):
+            return job and _backfill_summary(job)
+
+        status, results = await asyncio.to_thread(
+            self.gpt_service.get_batch_results, job["batch_id"], _backfill_schema
+        )
+        if results is None:
+            if status in _BACKFILL_FAILED_STATUSES:
+                job["status"] = "failed"
+                job["error"] = f"OpenAI batch {job['batch_id']} {status}"
+                await asyncio.to_thread(self.db_service.save_backfill_job, job)
+            return _backfill_summary(job)
+
+        # Only one of several concurrent polls processes the results and submits the next stage.
+        stage = job["status"]
+        if not await asyncio.to_thread(self.db_service.claim_backfill_job, job_id, stage, "processing"):
+            job = await asyncio.to_thread(self.db_service.get_backfill_job, job_id)
+            return _backfill_summary(job)
+
+        try:
+            if stage == "extracting":
+                events = [
+                    event
+                    for n, batch in enumerate(_chunks(job["articles"]))
+                    for event in self._events_from_extraction(batch, results.get(f"extract-{n}"))
+                    if event
+                ]
+                job["articles"] = []
+                job["event_count"] = len(events)
+                job["events"] = [event.model_dump(mode="json") for event in events]
+                if events:
+                    requests = []
+                    for n, batch in enumerate(_chunks(events)):
+                        requests.append((f"risks-{n}", GPT_MODEL, self._risk_messages(batch), EventRisksBatch))
+                        requests.append((f"location-{n}", GPT_MODEL, self._location_messages(batch), EventLocationBatch))
+                    job["batch_id"] = await asyncio.to_thread(self.gpt_service.submit_batch, requests)
+                    job["status"] = "classifying"
+                else:
+                    job["status"] = "completed"
+            else:
+                events = [Event(**record) for record in job["events"]]
+                for n, batch in enumerate(_chunks(events)):
+                    self._apply_risks(batch, results.get(f"risks-{n}"))
+                    self._apply_locations(batch, results.get(f"location-{n}"))
+                # Articles may have been fetched (and assessed) interactively since the job started;
+                # those stored events are kept as they are.
+                await asyncio.to_thread(self.db_service.insert_new_events, events)
+                job["events"] = []
+                job["status"] = "completed"
+        except Exception as e:
+            logger.exception("Error processing OpenAI batch %s of backfill %s", job["batch_id"], job_id)
+            job["status"] = "failed"
+            job["error"] = f"Failed to process OpenAI batch {job['batch_id']}: {e}"
+
+        await asyncio.to_thread(self.db_service.save_backfill_job, job)
+        return _backfill_summary(job)
+
+    async def get_backfill(self, job_id: str) -> Optional[dict]:
+        """Return a summary of the job as stored, without checking its OpenAI batch."""
+        job = await asyncio.to_thread(self.db_service.get_backfill_job, job_id)
+        return job and _backfill_summary(job)
+
+    @staticmethod
+    async def _run_in_batches(items: list, run_batch: Callable[[list], Awaitable[Any]]) -> list:
+        """Split items into BATCH_SIZE chunks and run one GPT request per chunk concurrently.
+        Returns the per-batch results in batch order."""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+
+        async def run(offset: int):
+            async with semaphore:
+                return await run_batch(items[offset:offset + BATCH_SIZE])
+
+        return await asyncio.gather(*(run(offset) for offset in range(0, len(items), BATCH_SIZE)))
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        # One pooled, keep-alive client for all NewsAPI calls; created lazily inside the event loop.
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0, connect=3.05),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                transport=httpx.AsyncHTTPTransport(retries=NEWS_API_MAX_RETRIES),
+            )
+        return self._http_client
 
-    def fetch_news(self, query: str, page_size: int = 10, from_date: str = None, to_date: str = None) -> List[Event]:
+    async def iter_news(self, query: str, page_size: int = 10, from_date: str = None,
+                        to_date: str = None) -> AsyncIterator[dict]:
+        """
+        Yield up to page_size articles matching the query, fetching NewsAPI pages of at most
+        NEWS_API_MAX_PAGE_SIZE articles as they are consumed.
+        """
+        page = 1
+        remaining = page_size
+        while remaining > 0:
+            articles = await self.fetch_news(query, min(remaining, NEWS_API_MAX_PAGE_SIZE), from_date, to_date, page)
+            for article in articles[:remaining]:
+                yield article
+            if len(articles) < min(remaining, NEWS_API_MAX_PAGE_SIZE):
+                return
+            remaining -= len(articles)
+            page += 1
+
+    async def iter_unique_news(self, query: str, page_size: int = 10, from_date: str = None,
+                               to_date: str = None) -> AsyncIterator[dict]:
+        """
+        Like iter_news, but drops repeated URLs and syndicated copies of an article already yielded.
         """
-        Fetch news articles using NewsAPI and return a list of Event objects.
+        seen_urls = set()
+        seen_fingerprints = set()
+        async for article in self.iter_news(query, page_size, from_date, to_date):
+            fingerprint = _article_fingerprint(article)
+            if article.get("url") in seen_urls or fingerprint in seen_fingerprints:
+                continue
+            seen_urls.add(article.get("url"))
+            seen_fingerprints.add(fingerprint)
+            yield article
+
+    async def fetch_news(self, query: str, page_size: int = 10, from_date: str = None,
+                         to_date: str = None, page: int = 1) -> List[dict]:
+        """
+        Fetch news articles using NewsAPI. Responses are cached in the database for
+        NEWS_CACHE_TTL_SECONDS and revalidated with If-None-Match when NewsAPI sent an ETag.
 
         Parameters:
         - query: The search query string (supports Boolean operators like OR).
         - page_size: Number of articles to retrieve (1 to 100).
         - from_date: (Optional) Start date for articles (format: YYYY-MM-DD).
         - to_date: (Optional) End date for articles (format: YYYY-MM-DD).
+        - page: (Optional) Page of results to fetch, starting at 1.
 
         Returns:
-        - A list of Event objects created from the articles.
+        - A list of raw article dictionaries.
         """
         url = "https://newsapi.org/v2/everything"
         params = {
             "q": query,
             "apiKey": self.news_api_key,
-            "pageSize": page_size
+            "pageSize": page_size,
+            "page": page
         }
         if from_date:
             params["from"] = from_date
         if to_date:
             params["to"] = to_date
 
-        try:
-            response = requests.get(url, params=params)
+        # The cache key leaves out the API key
+        cache_key = hashlib.sha256(
+            orjson.dumps({k: v for k, v in params.items() if k != "apiKey"}, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+        cached = await asyncio.to_thread(self.db_service.get_news_page, cache_key)
+        if cached and time.time() - cached[0] < NEWS_CACHE_TTL_SECONDS:
+            return orjson.loads(cached[2])
+        headers = {"If-None-Match": cached[1]} if cached and cached[1] else {}
+
+        client = self._get_http_client()
+        # Transport errors and NEWS_API_RETRY_STATUSES are retried; any other error status (e.g. an
+        # invalid or rate-limited key), and the last failure once retries are used up, is raised.
+        for attempt in range(NEWS_API_MAX_RETRIES + 1):
+            last_attempt = attempt == NEWS_API_MAX_RETRIES
+            try:
+                response = await client.get(url, params=params, headers=headers)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                logger.warning("Error fetching news for query=%r page=%s, retrying: %s", query, page, e)
+                await asyncio.sleep(NEWS_API_BACKOFF_SECONDS * 2 ** attempt)
+                continue
+            if response.status_code == 304 and cached:
+                await asyncio.to_thread(self.db_service.touch_news_page, cache_key)
+                return orjson.loads(cached[2])
+            if response.status_code in NEWS_API_RETRY_STATUSES and not last_attempt:
+                await asyncio.sleep(NEWS_API_BACKOFF_SECONDS * 2 ** attempt)
+                continue
             response.raise_for_status()
-            articles = response.json().get("articles", [])
-
-            events = []
-            for article in articles:
-                event = self.extract_event_from_article(article)
-                if event:
-                    events.append(event)
-
-            return events
-        except requests.exceptions.RequestException as e:
-            raise ValueError(f"Error fetching news: {e}")
+            articles = orjson.loads(response.content).get("articles", [])
+            await asyncio.to_thread(
+                self.db_service.save_news_page, cache_key, response.headers.get("ETag"), orjson.dumps(articles)
+            )
+            return articles
 
-    def extract_event_from_article(self, article: dict) -> Event:
+    async def extract_events_from_articles(self, articles: List[dict]) -> List[Event]:
         """
-        Extract an event from a news article using GPT. If the article does not describe an event,
-        return None.
+        Extract events from news articles using GPT, one request per batch of articles.
+        Articles that do not describe an event are dropped.
         """
-        system_prompt = (
-            "You are an expert supply chain analyst. Your task is to determine if a news article "
-            "describes an event that could impact supply chains. Events might include floods, law changes, "
-            "strikes, cyberattacks, or other disruptions.\n\n"
-            "Rules:\n"
-            "1. An event is a specific occurrence or development that has a potential impact on supply chains. "
-            "   General observations, industry overviews, or speculative pieces are not considered events.\n"
-            "2. If the article does not describe an event, respond with: {\"is_event\": false}.\n"
-            "3. If the article describes an event, extract:\n"
-            "   - A concise title summarizing the event.\n"
-            "   - A detailed description of the event, including specific entities, locations, systems, and potential impacts.\n"
-            "   - Set `is_event` to true.\n\n"
-            "Output format according to schema, with the following fields relevant for this task:\n"
-            "{\n"
-            "  \"is_event\": true,\n"
-            "  \"title\": \"<Event Title>\",\n"
-            "  \"description\": \"<Event Description>\"\n"
-            "}\n\n"
-            "Examples:\n"
-            "1. **Valid Event**:\n"
-            "   Input:\n"
-            "   Article Title: \"Cybersecurity Risk to DNA Sequencers\"\n"
-            "   Article Content: \"Security vulnerabilities in DNA sequencing devices could disrupt crucial clinical research.\"\n"
-            "   Output:\n"
-            "   {\n"
-            "     \"is_event\": true,\n"
-            "     \"title\": \"Cybersecurity Vulnerabilities in DNA Sequencers\",\n"
-            "     \"description\": \"Security vulnerabilities have been found in the DNA sequencing devices iSeq 100, "
-            "     developed by manufacturer Illumina. The devices were found to be running an insecure BIOS implementation, "
-            "     exposing them to malware and ransomware attacks. These vulnerabilities could disrupt critical clinical research.\"\n"
-            "   }\n\n"
-            "2. **Not an Event**:\n"
-            "   Input:\n"
-            "   Article Title: \"China as the Sole Manufacturing Superpower\"\n"
-            "   Article Content: \"China is currently the world's sole manufacturing superpower, highlighting its production capabilities.\"\n"
-            "   Output:\n"
-            "   {\n"
-            "     \"is_event\": false\n"
-            "   }\n"
-        )
+        batches = await self._run_in_batches(articles, self._extract_events_batch)
+        return [event for batch in batches for event in batch if event]
 
+    @staticmethod
+    def _extraction_messages(articles: List[dict]) -> List[dict]:
         user_prompt = (
-            f"Article Title: {article.get('title', 'No Title')}\n"
-            f"Article Content: {article.get('description', 'No Content Available')}\n\n"
-            "Determine if this article describes an event that could impact supply chains and respond accordingly."
+            "Articles:\n" +
+            "\n".join(
+                f"[{i}] Article Title: {article.get('title', 'No Title')}\n"
+                f"    Article Content: {article.get('description', 'No Content Available')}"
+                for i, article in enumerate(articles)
+            ) +
+            "\n\nFor each article, determine if it describes an event that could impact supply chains "
+            "and respond accordingly."
         )
+        return [{"role": "system", "content": _EXTRACTION_SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}]
+
+    @staticmethod
+    def _events_from_extraction(articles: List[dict], response) -> List[Optional[Event]]:
+        items = _items_by_index(response, ArticleEventBatch)
+        events = []
+        for i, article in enumerate(articles):
+            item = items.get(i)
+            if not item or not item.is_event:
+                events.append(None)
+                continue
+            try:
+                events.append(Event(
+                    id=article.get("url"),
+                    title=item.title,
+                    description=item.description,
+                    risk_categories=None,  # To be assigned later
+                    timestamp=article.get("publishedAt"),
+                    location=None,
+                    source_name=article.get("source", {}).get("name"),
+                    author=article.get("author"),
+                    url=article.get("url"),
+                    is_event=item.is_event
+                ))
+            except ValidationError:
+                # e.g. is_event without a title; only this article is dropped, not its batch.
+                logger.warning("Dropping invalid event extracted from article %s", article.get("url"), exc_info=True)
+                events.append(None)
+        return events
 
+    async def _extract_events_batch(self, articles: List[dict]) -> List[Optional[Event]]:
         try:
-            response = self.gpt_service.call_gpt_with_schema(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                schema=Event
-            )
-
-            if not response.is_event:
-                return None
-
-            return Event(
-                id=article.get("url"),
-                title=response.title,
-                description=response.description,
-                risk_categories=None,  # To be assigned later
-                timestamp=article.get("publishedAt"),
-                location=None,
-                source_name=article.get("source", {}).get("name"),
-                author=article.get("author"),
-                url=article.get("url"),
-                is_event=response.is_event
+            response = await self.gpt_service.call_gpt_with_schema_async(
+                model=GPT_MODEL,
+                messages=self._extraction_messages(articles),
+                schema=ArticleEventBatch
             )
-        except Exception as e:
-            print(f"Error extracting event: {e}")
-            return None
+            return self._events_from_extraction(articles, response)
+        except Exception:
+            logger.exception("Error extracting events from %d articles", len(articles))
+            return [None] * len(articles)
 
-    def assign_risk_categories(self, event: Event) -> Event:
+    async def assign_risk_categories(self, events: List[Event]) -> List[Event]:
         """
-        Assign risk categories to an event using GPT.
+        Assign risk categories to events using GPT, one request per batch of events.
+        Events with the same text as an already classified event reuse its categories, and when a
+        local classifier is configured, only events it is unsure about are sent to GPT.
         """
+        pending = []
+        for event in events:
+            cached = self.risk_cache.lookup(_event_text(event))
+            if cached is None:
+                pending.append(event)
+            else:
+                event.risk_categories = [risk.model_copy(deep=True) for risk in cached]
+
+        if self.local_risk_classifier and pending:
+            local_risks = await asyncio.to_thread(self.local_risk_classifier.classify, pending)
+            classified = pending
+            pending = []
+            for event, risks in zip(classified, local_risks):
+                if risks is None:
+                    pending.append(event)
+                else:
+                    event.risk_categories = risks
+                    self.risk_cache.add(_event_text(event), risks)
+
+        await self._run_in_batches(pending, self._assign_risk_categories_batch)
+        for event in pending:
+            if event.risk_categories:
+                self.risk_cache.add(_event_text(event), event.risk_categories)
+        return events
 
-        system_prompt = (
-            "You are an expert risk analyst. Your task is to classify events into risk categories based on "
-            "the Cambridge Risk Taxonomy.\n\n"
-            "The taxonomy has three levels:\n"
-            "- Class: Broadest category (e.g., Geopolitical, Environmental).\n"
-            "- Family: Subcategories within each class.\n"
-            "- Type: Specific examples to guide your classification.\n\n"
-            "Rules for classification:\n"
-            "1. Always assign at least one class to every event.\n"
-            "2. Assign families only when they are relevant. If no family fits well, leave the class unaccompanied.\n"
-            "3. If multiple families fit well within a class, you may assign more than one. However, choose only those that are highly relevant.\n"
-            "4. Use the types as context to guide your decisions but do not include them in the output.\n\n"
-            "Output format:\n"
-            "- A list of Risk objects, each with:\n"
-            "  - `class_name`: The main risk category.\n"
-            "  - `families`: An optional array of subcategories.\n"
-        )
-
-        risk_prompt = (
-            f"Event Title: {event.title}\n"
-            f"Event Description: {event.description}\n\n"
-            "Classify this event into one or more risk categories using the Cambridge Risk Taxonomy.\n\n"
-            "The taxonomy includes the following classes and families:\n\n"
-            "1. Financial:\n"
-            "   - Economic Outlook:\n"
-            "     - Recession, Stagnation, Contraction, Credit Crisis, Steady Growth, Expansion, Acceleration, Peak\n"
-            "   - Economic Variables:\n"
-            "     - Commodity Price Fluctuation, Inflation, Interest Rates\n"
-            "   - Market Crisis:\n"
-            "     - Asset Bubble, Bank Run, Sovereign Debt Crisis, Flash Crash, Fraudulent Market Manipulation, Cryptocurrency Failure, Reserve Currency Shift\n"
-            "   - Trading Environment:\n"
-            "     - Tariff Dispute, Cartel Manipulates Market, Organised Crime\n"
-            "   - Company Outlook:\n"
-            "     - Hostile Takeover, Credit Rating Downgrade, Investor Negative Outlook\n"
-            "   - Competition:\n"
-            "     - Disruptive Competitor, Aggressive Competitor, Fraudulent Competitor, Intellectual Property Theft\n"
-            "   - Counterparty:\n"
-            "     - Supplier Failure, Customer Failure, Government Failure, Creditor Failure, Counterparty Fraud\n\n"
-            "2. Geopolitical:\n"
-            "   - Business Environment (Country Risk):\n"
-            "     - Talent Availability, Industrial Action, Minimum Wage Hike, Sanctions, Territorial Disputes, Logistics Restrictions\n"
-            "   - Corruption & Crime:\n"
-            "     - Corruption Deterioration, Crime Wave/Piracy Increase, Slavery Practices\n"
-            "   - Government Business Policy:\n"
-            "     - Emerging Regulation, Corporation Tax Rate Hike, Diverted Profits Tax, Nationalisation, Confiscation of Assets, Privatisation, License Revocation\n"
-            "   - Change in Government:\n"
-            "     - Nationalism/Protectionism, Left-Wing Radicalism, Right-Wing Radicalism, Populism, Environmentalism\n"
-            "   - Political Violence:\n"
-            "     - Social Unrest, Terrorism, Subnational Conflict & Civil War, Coup d’État\n"
-            "   - Interstate Conflict:\n"
-            "     - Conventional Military War, Asymmetric War, Nuclear War, Cold War\n\n"
-            "3. Technology:\n"
-            "   - Disruptive Technology:\n"
-            "     - E-Commerce, Gig Economy, Artificial Intelligence, 5G Technology, Blockchain, Robotics & Automation, Augmented/Virtual Reality, Cryptocurrency, Autonomous Vehicles, Drones, Medical Advances\n"
-            "   - Cyber:\n"
-            "     - Data Exfiltration, Contagious Malware, Cloud Outage, Financial Theft, Distributed Denial of Service, Internet of Things, Industrial Control Systems, Internet Failure\n"
-            "   - Critical Infrastructure:\n"
-            "     - Power, Transport, Telecommunications, Satellite Systems, Water & Waste, Fuel, Gas\n"
-            "   - Industrial Accident:\n"
-            "     - Fire, Explosion, Pollution, Structural Failure, Nuclear\n\n"
-            "4. Environmental:\n"
-            "   - Extreme Weather:\n"
-            "     - Flood, Tropical Windstorm, Temperate Windstorm, Drought, Freeze, Heatwave, Wildfire\n"
-            "   - Geophysical:\n"
-            "     - Earthquake, Volcanic Eruption, Tsunami\n"
-            "   - Space:\n"
-            "     - Solar Storm, Astronomical Impact Event\n"
-            "   - Climate Change:\n"
-            "     - Physical, Liability, Transition, Increase in Extreme Weather, Sea Level Rise, Ocean Acidification, Lower Carbon Economy\n"
-            "   - Environmental Degradation:\n"
-            "     - Waste & Pollution, Biodiversity Loss, Ecosystem Collapse, Deforestation, Soil Degradation\n"
-            "   - Natural Resource Deficiency:\n"
-            "     - Fossil Fuels, Biogeochemicals, Raw Materials, Water\n"
-            "   - Food Security:\n"
-            "     - Animal Epidemic, Plant Epidemic, Famine\n\n"
-            "5. Social:\n"
-            "   - Socioeconomic Trends:\n"
-            "     - Ageing Population, Gender Imbalance, Wealth Inequality, Poor Educational Standards, Migration\n"
-            "   - Human Capital:\n"
-            "     - Failure to Attract Talent, Gender & Diversity, Labour Disputes & Strikes, Loss of Key Personnel, Employee Misconduct\n"
-            "   - Brand Perception:\n"
-            "     - Fake News, Negative Media Coverage, Key Influencer Disruption, Negative Customer Experience\n"
-            "   - Sustainable Living:\n"
-            "     - Consumer Activism, Sustainable Purchasing, Supply Chain Provenance, Diet\n"
-            "   - Health Trends:\n"
-            "     - Obesity, Longevity, Antimicrobial Resistance, Medical Breakthroughs, Healthcare, Social Care\n"
-            "   - Infectious Disease:\n"
-            "     - Influenza Pandemics, Coronavirus-like Epidemics, Viral Hemorrhagic Fevers, Preventable Disease Outbreaks, Unknown Emergent Diseases\n\n"
-            "6. Governance:\n"
-            "   - Non-Compliance:\n"
-            "     - Emerging Regulation, Internal Corruption & Fraud, Negligence, Revised Accounting Standards, Occupational Health & Safety\n"
-            "   - Litigation:\n"
-            "     - Private Lawsuit, Mass Tort, Class Action\n"
-            "   - Strategic Performance:\n"
-            "     - Divestitures, Joint Ventures, Mergers & Acquisitions, Restructuring, Poor Investment\n"
-            "   - Management Performance:\n"
-            "     - Executive Mismanagement, Ineffective Board, Management Execution Failure\n"
-            "   - Business Model Deficiencies:\n"
-            "     - Technology, Customer Preference Change\n"
-            "   - Pension Management:\n"
-            "     - Contribution Management, Fund Management\n"
-            "   - Products & Services:\n"
-            "     - Product Defect/Failure, Innovation (R&D) Failure\n\n"
-            "Return the output as a list of Risk objects in this format:\n"
-            "[\n"
-            "  {\"class_name\": \"Geopolitical\", \"families\": [\"Corruption & Crime\", \"Political Violence\"]},\n"
-            "  {\"class_name\": \"Social\", \"families\": [\"Socioeconomic Trends\"]}\n"
-            "]"
+    @staticmethod
+    def _risk_messages(events: List[Event]) -> List[dict]:
+        risk_prompt = _RISK_TAXONOMY_PREFIX + "\n".join(
+            f"[{i}] Event Title: {event.title}\n"
+            f"    Event Description: {event.description}"
+            for i, event in enumerate(events)
         )
+        return [{"role": "system", "content": _RISK_SYSTEM_PROMPT}, {"role": "user", "content": risk_prompt}]
 
-        class RiskList(BaseModel):
-            risks: List[Risk]
+    @staticmethod
+    def _apply_risks(events: List[Event], response) -> None:
+        items = _items_by_index(response, EventRisksBatch)
+        for i, event in enumerate(events):
+            item = items.get(i)
+            event.risk_categories = item.risks if item else []
 
+    async def _assign_risk_categories_batch(self, events: List[Event]) -> None:
         try:
-            response = self.gpt_service.call_gpt_with_schema(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": risk_prompt},
-                ],
-                schema=RiskList
+            response = await self.gpt_service.call_gpt_with_schema_async(
+                model=GPT_MODEL,
+                messages=self._risk_messages(events),
+                schema=EventRisksBatch
             )
+            self._apply_risks(events, response)
+        except Exception:
+            logger.exception("Error assigning risk categories to %d events", len(events))
+            for event in events:
+                event.risk_categories = []
 
-            event.risk_categories = response.risks
-        except Exception as e:
-            print(f"Error assigning risk categories: {e}")
-            event.risk_categories = []
-
-        return event
-
-    def assign_location(self, event: Event) -> Event:
+    async def assign_location(self, events: List[Event]) -> List[Event]:
         """
-        Assign a location to an event based on its title and description.
+        Assign a location to each event based on its title and description, one request per batch.
+        When a local geocoder is configured, only events it cannot resolve are sent to GPT.
         """
+        pending = events
+        if self.local_geocoder and pending:
+            local_locations = await asyncio.to_thread(self.local_geocoder.locate, pending)
+            located = pending
+            pending = []
+            for event, location in zip(located, local_locations):
+                if location is None:
+                    pending.append(event)
+                else:
+                    event.location = location
+
+        await self._run_in_batches(pending, self._assign_location_batch)
+        return events
 
-        system_prompt = (
-            "You are an expert supply chain analyst. Your task is to determine the most relevant location "
-            "for an event based on its description and title, focusing on its impact on supply chains. "
-            "Consider how and where the event could disrupt supply chain operations.\n\n"
-            "Rules:\n"
-            "1. Assign a location only if it is clearly relevant to the supply chain impact of the event.\n"
-            "   - This could be the location where the event occurs, or where its effects are most significant.\n"
-            "2. If the event affects multiple countries or an entire region, use `geographic_scope` to indicate "
-            "this broader impact (e.g., 'Global', 'Asia', 'Europe').\n"
-            "3. Provide the most relevant level of detail (country, region, city) without being overly specific.\n"
-            "4. If no specific location can be determined, set the location to a broad `geographic_scope` (e.g., 'Global').\n\n"
-            "Output format:\n"
-            "{\n"
-            "  \"geographic_scope\": \"<Global or Continent>\",\n"
-            "  \"country\": \"<Country>\",\n"
-            "  \"region\": \"<Region>\",\n"
-            "  \"city\": \"<City>\",\n"
-            "  \"coordinates\": [<Latitude>, <Longitude>]\n"
-            "}\n"
-            "If no specific location is relevant, return:\n"
-            "{\n"
-            "  \"geographic_scope\": \"Global\",\n"
-            "  \"country\": null,\n"
-            "  \"region\": null,\n"
-            "  \"city\": null,\n"
-            "  \"coordinates\": null\n"
-            "}\n\n"
-            "Examples:\n"
-            "1. **Specific Location**:\n"
-            "   Event Title: \"China's Tightened Export Controls Impact Apple Supply Chain\"\n"
-            "   Event Description: \"Apple's efforts to diversify its supply chain are being hindered by tightened export "
-            "   controls imposed by China. The restrictions are affecting manufacturing processes and may lead to delays.\"\n"
-            "   Output:\n"
-            "   {\n"
-            "     \"geographic_scope\": null,\n"
-            "     \"country\": \"China\",\n"
-            "     \"region\": null,\n"
-            "     \"city\": null,\n"
-            "     \"coordinates\": [35.8617, 104.1954]\n"
-            "   }\n\n"
-            "2. **Global Impact**:\n"
-            "   Event Title: \"Security Vulnerabilities in DNA Sequencers\"\n"
-            "   Event Description: \"Eclypsium, an Argentine cybersecurity firm, has reported that leading DNA sequencing "
-            "   devices are running on outdated firmware, making them vulnerable to takeovers and disruptions. "
-            "   This could affect clinical research globally.\"\n"
-            "   Output:\n"
-            "   {\n"
-            "     \"geographic_scope\": \"Global\",\n"
-            "     \"country\": null,\n"
-            "     \"region\": null,\n"
-            "     \"city\": null,\n"
-            "     \"coordinates\": null\n"
-            "   }\n\n"
-            "3. **Region-Specific Impact**:\n"
-            "   Event Title: \"Floods Disrupt Logistics in Southeast Asia\"\n"
-            "   Event Description: \"Severe flooding in Southeast Asia has disrupted major shipping routes, delaying "
-            "   goods bound for global markets.\"\n"
-            "   Output:\n"
-            "   {\n"
-            "     \"geographic_scope\": \"Asia\",\n"
-            "     \"country\": null,\n"
-            "     \"region\": \"Southeast Asia\",\n"
-            "     \"city\": null,\n"
-            "     \"coordinates\": null\n"
-            "   }\n"
-        )
-
+    @staticmethod
+    def _location_messages(events: List[Event]) -> List[dict]:
         user_prompt = (
-            f"Event Title: {event.title}\n"
-            f"Event Description: {event.description}\n\n"
-            "Determine the most relevant location for this event's impact on supply chains. "
-            "Provide the output as a `Location` object in the specified format."
+            "Events:\n" +
+            "\n".join(
+                f"[{i}] Event Title: {event.title}\n"
+                f"    Event Description: {event.description}"
+                for i, event in enumerate(events)
+            ) +
+            "\n\nDetermine the most relevant location for each event's impact on supply chains. "
+            "Provide each location as a `Location` object in the specified format."
         )
+        return [{"role": "system", "content": _LOCATION_SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}]
+
+    @staticmethod
+    def _apply_locations(events: List[Event], response) -> None:
+        items = _items_by_index(response, EventLocationBatch)
+        for i, event in enumerate(events):
+            item = items.get(i)
+            event.location = item.location if item else None
 
+    async def _assign_location_batch(self, events: List[Event]) -> None:
         try:
-            response = self.gpt_service.call_gpt_with_schema(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                schema=Location
+            response = await self.gpt_service.call_gpt_with_schema_async(
+                model=GPT_MODEL,
+                messages=self._location_messages(events),
+                schema=EventLocationBatch
             )
-
-            event.location = response
-        except Exception as e:
-            print(f"Error assigning location: {e}")
-            event.location = None
-
-        return event
+            self._apply_locations(events, response)
+        except Exception:
+            logger.exception("Error assigning locations to %d events", len(events))
+            for event in events:
+                event.location = None
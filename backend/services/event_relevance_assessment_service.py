@@ -1,117 +1,151 @@
-from typing import List
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
 from backend.models.models import Event, SupplyChain, EventRiskAssessment
 from backend.services.gpt_service import GPTService
 
-LIKELIHOOD_MAPPING = {
-    "Rare": 0.001,
-    "Unlikely": 0.01,
-    "Possible": 0.1,
-    "Likely": 0.5,
-    "Almost Certain": 0.9
-}
-
-IMPACT_MAPPING = {
-    "Insignificant": 0.001,
-    "Minor": 0.01,
-    "Moderate": 0.1,
-    "Major": 0.5,
-    "Catastrophic": 0.9
-}
+logger = logging.getLogger(__name__)
+
+# GPT returns likelihood and impact directly as values on the 0.001-0.9 scale described in the prompt.
+# Raw risk (likelihood + impact) ranges from 0.001 + 0.001 = 0.002 to 0.9 + 0.9 = 1.8.
+MIN_RAW_RISK = 0.002
+RAW_RISK_SCALE = 1.0 / (1.8 - MIN_RAW_RISK)
+
+# Events of a supply chain are assessed in chunks of this size, one GPT request per chunk.
+ASSESSMENT_BATCH_SIZE = 20
+# Maximum number of assessment requests in flight at once, to stay within OpenAI rate limits.
+MAX_CONCURRENT_ASSESSMENTS = 20
+
+_SYSTEM_PROMPT = (
+    "You are an expert in supply chain risk management. Your task is to analyze an event and determine:\n"
+    "1. **Whether it is relevant to the supply chain** (True/False).\n"
+    "2. **If relevant, what is its likelihood and impact?**\n\n"
+    "**Step 1: Assess Relevance**\n"
+    "An event is **relevant** if it has a direct or indirect effect on the supply chain. Consider:\n"
+    "- **Location:** Does the event affect supply chain nodes, suppliers, or transport routes?\n"
+    "- **Risk Categories:** Are the risks associated with the event relevant to supply chain operations?\n"
+    "- **Broader Impacts:** Could this event cause indirect disruptions (e.g., regulatory changes, market shifts)?\n"
+    "If **not relevant**, return:\n"
+    "{'is_relevant': false, 'likelihood': null, 'impact': null, 'reason': 'Explanation'}\n\n"
+    "**Step 2: If Relevant, Assess Likelihood and Impact**\n"
+    "**Likelihood (Probability of Disruption):**\n"
+    "- Rare (0.001) – Extremely unlikely but possible.\n"
+    "- Unlikely (0.01) – Has happened before but is improbable.\n"
+    "- Possible (0.1) – Could reasonably occur under certain conditions.\n"
+    "- Likely (0.5) – Expected to occur in many situations.\n"
+    "- Almost Certain (0.9) – Nearly inevitable.\n\n"
+    "**Impact (Severity of Disruption):**\n"
+    "- Insignificant (0.001) – No/minimal effect.\n"
+    "- Minor (0.01) – Small, manageable disruptions.\n"
+    "- Moderate (0.1) – Noticeable disruptions requiring intervention.\n"
+    "- Major (0.5) – Significant disruptions.\n"
+    "- Catastrophic (0.9) – Severe disruptions threatening business continuity.\n\n"
+    "**Final Output Format:**\n"
+    "{'is_relevant': true/false, 'likelihood': 'Rare/Possible/etc.', 'impact': 'Minor/Moderate/etc.', 'reason': 'Explanation'}\n\n"
+    "You will receive several numbered events for the same supply chain. Assess each event independently and "
+    "return one item per event in `items`, with `index` set to the event's number."
+)
+
+
+class IndexedEventAssessment(BaseModel):
+    index: int  # Position of the event within the batch
+    is_relevant: bool
+    likelihood: Optional[float] = None
+    impact: Optional[float] = None
+    reason: Optional[str] = None
+
+
+class BatchAssessment(BaseModel):
+    items: List[IndexedEventAssessment]
 
 
 class EventRelevanceAssessmentService:
     def __init__(self):
         self.gpt_service = GPTService()
+        # Rendered supply-chain context per supply chain ID, with the model it was rendered from
+        self._supply_chain_blocks: Dict[str, Tuple[SupplyChain, str]] = {}
 
     def assess_events(self, supply_chain: SupplyChain, events: List[Event]) -> List[Event]:
         """
-        Assess relevance, likelihood, and impact for a list of events in a single GPT request per event.
+        Assess relevance, likelihood, and impact for a list of events.
+        Synchronous wrapper around assess_events_async.
+        """
+        return asyncio.run(self.assess_events_async(supply_chain, events))
+
+    async def assess_events_async(self, supply_chain: SupplyChain, events: List[Event]) -> List[Event]:
+        """
+        Assess events in chunks of ASSESSMENT_BATCH_SIZE, sending the supply chain context once per
+        chunk; chunks run concurrently with at most MAX_CONCURRENT_ASSESSMENTS requests in flight.
         """
-        for event in events:
-            self._assess_event(supply_chain, event)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ASSESSMENTS)
+        supply_chain_block = self._get_supply_chain_block(supply_chain)
 
+        async def assess(batch: List[Event]):
+            async with semaphore:
+                await self._assess_batch(supply_chain, supply_chain_block, batch)
+
+        await asyncio.gather(*(
+            assess(events[offset:offset + ASSESSMENT_BATCH_SIZE])
+            for offset in range(0, len(events), ASSESSMENT_BATCH_SIZE)
+        ))
         return events
 
-    def _assess_event(self, supply_chain: SupplyChain, event: Event) -> None:
+    async def _assess_batch(self, supply_chain: SupplyChain, supply_chain_block: str, events: List[Event]) -> None:
         """
-        Determines if an event is relevant. If relevant, it also assesses likelihood and impact.
+        Determines for each event if it is relevant. If relevant, it also assesses likelihood and impact.
         """
-
-        prompt_messages = self._build_gpt_prompt(supply_chain, event)
+        prompt_messages = self._build_gpt_prompt(supply_chain_block, events)
 
         try:
-            response = self.gpt_service.call_gpt_with_schema(
+            response = await self.gpt_service.call_gpt_with_schema_async(
                 model="gpt-4o-mini",
                 messages=prompt_messages,
-                schema=EventRiskAssessment
+                schema=BatchAssessment
             )
+            items = {item.index: item for item in response.items} if isinstance(response, BatchAssessment) else {}
+        except Exception:
+            logger.exception("Error assessing %d events for supply chain %s", len(events), supply_chain.id)
+            items = {}
 
-            is_relevant = response.is_relevant
-            reason = response.reason
-            likelihood_value = response.likelihood
-            impact_value = response.impact
-
+        for i, event in enumerate(events):
             event.supply_chain_id = supply_chain.id
-
-            if not is_relevant:
+            item = items.get(i)
+            if item is None:
+                event.risk_assessment = EventRiskAssessment(
+                    is_relevant=False,
+                    reason="Assessment failed due to an error."
+                )
+            elif not item.is_relevant or item.likelihood is None or item.impact is None:
                 event.risk_assessment = EventRiskAssessment(
                     is_relevant=False,
-                    reason=reason
+                    reason=item.reason
                 )
             else:
-                # Calculate the raw risk as the sum of likelihood and impact
-                raw_risk = likelihood_value + impact_value
-                # Normalize the risk:
-                # Minimum possible raw risk = 0.001 + 0.001 = 0.002
-                # Maximum possible raw risk = 0.9 + 0.9 = 1.8
-                normalized_risk = (raw_risk - 0.002) / (1.8 - 0.002)
+                # Normalize the raw risk (sum of likelihood and impact) to [0, 1]
+                normalized_risk = (item.likelihood + item.impact - MIN_RAW_RISK) * RAW_RISK_SCALE
 
                 event.risk_assessment = EventRiskAssessment(
                     is_relevant=True,
-                    likelihood=likelihood_value,
-                    impact=impact_value,
+                    likelihood=item.likelihood,
+                    impact=item.impact,
                     risk_score=normalized_risk,
-                    reason=reason
+                    reason=item.reason
                 )
 
-        except Exception as e:
-            print(f"Error assessing event: {e}")
-            event.risk_assessment = EventRiskAssessment(
-                is_relevant=False,
-                reason="Assessment failed due to an error."
-            )
+    def _get_supply_chain_block(self, supply_chain: SupplyChain) -> str:
+        """Render the supply-chain context once and reuse it while the same model is passed in."""
+        cached = self._supply_chain_blocks.get(supply_chain.id)
+        if cached is None or cached[0] is not supply_chain:
+            cached = (supply_chain, self._supply_chain_block(supply_chain))
+            self._supply_chain_blocks[supply_chain.id] = cached
+        return cached[1]
 
     @staticmethod
-    def _build_gpt_prompt(supply_chain: SupplyChain, event: Event) -> List[dict]:
-        system_prompt = (
-            "You are an expert in supply chain risk management. Your task is to analyze an event and determine:\n"
-            "1. **Whether it is relevant to the supply chain** (True/False).\n"
-            "2. **If relevant, what is its likelihood and impact?**\n\n"
-            "**Step 1: Assess Relevance**\n"
-            "An event is **relevant** if it has a direct or indirect effect on the supply chain. Consider:\n"
-            "- **Location:** Does the event affect supply chain nodes, suppliers, or transport routes?\n"
-            "- **Risk Categories:** Are the risks associated with the event relevant to supply chain operations?\n"
-            "- **Broader Impacts:** Could this event cause indirect disruptions (e.g., regulatory changes, market shifts)?\n"
-            "If **not relevant**, return:\n"
-            "{'is_relevant': false, 'likelihood': null, 'impact': null, 'reason': 'Explanation'}\n\n"
-            "**Step 2: If Relevant, Assess Likelihood and Impact**\n"
-            "**Likelihood (Probability of Disruption):**\n"
-            "- Rare (0.001) – Extremely unlikely but possible.\n"
-            "- Unlikely (0.01) – Has happened before but is improbable.\n"
-            "- Possible (0.1) – Could reasonably occur under certain conditions.\n"
-            "- Likely (0.5) – Expected to occur in many situations.\n"
-            "- Almost Certain (0.9) – Nearly inevitable.\n\n"
-            "**Impact (Severity of Disruption):**\n"
-            "- Insignificant (0.001) – No/minimal effect.\n"
-            "- Minor (0.01) – Small, manageable disruptions.\n"
-            "- Moderate (0.1) – Noticeable disruptions requiring intervention.\n"
-            "- Major (0.5) – Significant disruptions.\n"
-            "- Catastrophic (0.9) – Severe disruptions threatening business continuity.\n\n"
-            "**Final Output Format:**\n"
-            "{'is_relevant': true/false, 'likelihood': 'Rare/Possible/etc.', 'impact': 'Minor/Moderate/etc.', 'reason': 'Explanation'}"
-        )
-
-        user_prompt = (
+    def _supply_chain_block(supply_chain: SupplyChain) -> str:
+        return (
             f"Supply Chain:\n"
             f"Company: {supply_chain.companyName}\n"
             f"Description: {supply_chain.description}\n"
@@ -119,16 +153,25 @@ class EventRelevanceAssessmentService:
             "\n".join(
                 f"- {node.type} in {node.location.city or node.location.region or node.location.country}"
                 for node in supply_chain.nodes
+            )
+        )
+
+    @staticmethod
+    def _build_gpt_prompt(supply_chain_block: str, events: List[Event]) -> List[dict]:
+        user_prompt = (
+            supply_chain_block +
+            "\n\nAssess the following events:\n" +
+            "\n---\n".join(
+                f"[{i}] Title: {event.title}\n"
+                f"Description: {event.description}\n"
+                f"Location: {event.location}\n"
+                f"Risk Categories: {event.risk_categories}"
+                for i, event in enumerate(events)
             ) +
-            f"\n\nEvent:\n"
-            f"Title: {event.title}\n"
-            f"Description: {event.description}\n"
-            f"Location: {event.location}\n"
-            f"Risk Categories: {event.risk_categories}\n\n"
-            "Task:\n"
+            "\n\nTask (for each event):\n"
             "1. Determine whether this event is **relevant**.\n"
             "2. If relevant, assign a **likelihood** and **impact** based on the provided categories.\n"
             "3. Provide a single **justification** that explains all three aspects."
         )
 
-        return [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+        return [{"role": "system", "content": _SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}]
@@ -0,0 +1,45 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class EventTextCache:
+    """
+    In-memory LRU cache keyed on an event's normalised text (lowercased words, punctuation and
+    whitespace dropped). Only exact duplicates match: the same story from another outlet with
+    the same extracted title and description does, a similar story about another place does not.
+    """
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._values: "OrderedDict[str, Any]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(_TOKEN_RE.findall(text.lower()))
+
+    def lookup(self, text: str) -> Optional[Any]:
+        key = self.normalize(text)
+        with self.lock:
+            value = self._values.get(key)
+            if value is None:
+                self.stats["misses"] += 1
+                return None
+            self._values.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def add(self, text: str, value: Any) -> None:
+        key = self.normalize(text)
+        if not key:
+            return
+        with self.lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            if len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
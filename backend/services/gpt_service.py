@@ -1,14 +1,121 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 import openai
+import orjson
 from dotenv import load_dotenv
 import os
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
+# Cached structured responses are replayed for a week before the API is asked again.
+GPT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+@functools.lru_cache(maxsize=32)
+def _response_format_for(schema) -> dict:
+    """Strict JSON-schema response_format for a Pydantic schema, generated once per schema class."""
+    # The SDK's public function-tool helper converts the model to the strict schema structured outputs require.
+    function = openai.pydantic_function_tool(schema)["function"]
+    return {
+        "type": "json_schema",
+        "json_schema": {"schema": function["parameters"], "name": schema.__name__, "strict": True},
+    }
+
+
+@functools.lru_cache(maxsize=32)
+def _schema_fingerprint(schema) -> str:
+    """Hash of a Pydantic schema's JSON schema, so that cached responses are keyed on its fields, not just its name."""
+    return hashlib.sha256(orjson.dumps(schema.model_json_schema(), option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def _parse_structured(response, schema):
+    message = response.choices[0].message
+    if getattr(message, "refusal", None) or not message.content:
+        raise ValueError(f"GPT returned no structured output: {getattr(message, 'refusal', None)}")
+    return schema.model_validate_json(message.content)
+
+
+class GPTResponseCache:
+    """
+    Exact-match, on-disk cache of structured GPT responses keyed by (model, messages, schema).
+    Expired responses are purged on open and on every write.
+    """
+
+    def __init__(self, db_name="gpt_cache.db", ttl: float = GPT_CACHE_TTL_SECONDS):
+        self.db_path = Path(__file__).resolve().parent.parent / "data" / db_name
+        self.ttl = ttl
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, data BLOB NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses (expires_at)")
+            self._purge_expired()
+
+    def _purge_expired(self):
+        self.conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    @staticmethod
+    def make_key(model: str, messages: list[dict], schema) -> str:
+        payload = orjson.dumps(
+            [model, messages, schema.__name__, _schema_fingerprint(schema)], option=orjson.OPT_SORT_KEYS, default=str
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str, schema) -> Optional[object]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is not None:
+            try:
+                parsed = schema.model_validate_json(row[0])
+            except ValueError:
+                # Written under an older shape of the schema; answered by the API again instead.
+                logger.warning("Discarding cached GPT response %s that no longer matches %s", key, schema.__name__)
+                with self.lock, self.conn:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            else:
+                self.stats["hits"] += 1
+                return parsed
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, parsed) -> None:
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO responses (key, expires_at, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at, data = excluded.data",
+                (key, time.time() + self.ttl, parsed.model_dump_json())
+            )
+            self._purge_expired()
+
 
 class GPTService:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
         openai.api_key = self.api_key
+        self._async_client = None
+        self.cache = GPTResponseCache()
+
+    def _get_async_client(self) -> openai.AsyncOpenAI:
+        # Created lazily so the service can be constructed without an API key.
+        if self._async_client is None:
+            self._async_client = openai.AsyncOpenAI(api_key=self.api_key)
+        return self._async_client
 
     def call_gpt(self, model: str, messages: list[dict]) -> str:
         """Generic GPT API call."""
@@ -18,21 +125,96 @@ class GPTService:
                 messages=messages
             )
             return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Error during GPT API call: {e}")
+        except Exception:
+            logger.exception("Error during GPT API call (model=%s)", model)
             return "GPT API call failed."
 
     def call_gpt_with_schema(self, model: str, messages: list[dict], schema) -> any:
         """
         Call GPT with structured output schema.
+        Identical requests are answered from the response cache; the schema's response_format is
+        generated once per schema class rather than on every call.
+        """
+        key = self.cache.make_key(model, messages, schema)
+        cached = self.cache.get(key, schema)
+        if cached is not None:
+            return cached
+        try:
+            response = openai.chat.completions.create(
+                model=model,
+                messages=messages,
+                response_format=_response_format_for(schema),
+            )
+            parsed = _parse_structured(response, schema)
+            self.cache.set(key, parsed)
+            return parsed
+        except Exception:
+            logger.exception("Error during GPT API call with schema %s (model=%s)", schema.__name__, model)
+            return {}
+
+    async def call_gpt_with_schema_async(self, model: str, messages: list[dict], schema) -> any:
         """
+        Async variant of call_gpt_with_schema, so several calls can be awaited concurrently.
+        The cache's SQLite reads and writes run in a worker thread, off the event loop.
+        """
+        key = self.cache.make_key(model, messages, schema)
+        cached = await asyncio.to_thread(self.cache.get, key, schema)
+        if cached is not None:
+            return cached
         try:
-            response = openai.beta.chat.completions.parse(
+            response = await self._get_async_client().chat.completions.create(
                 model=model,
                 messages=messages,
-                response_format=schema,
+                response_format=_response_format_for(schema),
             )
-            return response.choices[0].message.parsed
-        except Exception as e:
-            print(f"Error during GPT API call with schema: {e}")
+            parsed = _parse_structured(response, schema)
+            await asyncio.to_thread(self.cache.set, key, parsed)
+            return parsed
+        except Exception:
+            logger.exception("Error during GPT API call with schema %s (model=%s)", schema.__name__, model)
             return {}
+
+    def submit_batch(self, requests: List[Tuple[str, str, list[dict], Any]]) -> str:
+        """
+        Submit structured-output requests, given as (custom_id, model, messages, schema), to the
+        OpenAI Batch API. Batches complete within 24 hours at half the price of regular calls.
+        Returns the batch ID.
+        """
+        lines = [
+            orjson.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": model, "messages": messages, "response_format": _response_format_for(schema)},
+            })
+            for custom_id, model, messages, schema in requests
+        ]
+        batch_file = openai.files.create(file=("batch.jsonl", b"\n".join(lines)), purpose="batch")
+        batch = openai.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+
+    def get_batch_results(self, batch_id: str, schema_for: Callable[[str], Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Return the status of a batch and, once completed, its parsed results keyed by custom_id.
+        Requests that failed or could not be parsed are missing from the results.
+        """
+        batch = openai.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            return batch.status, None
+
+        results = {}
+        if batch.output_file_id:
+            for line in openai.files.content(batch.output_file_id).content.splitlines():
+                record = orjson.loads(line)
+                custom_id = record["custom_id"]
+                try:
+                    message = record["response"]["body"]["choices"][0]["message"]
+                    results[custom_id] = schema_for(custom_id).model_validate_json(message["content"])
+                except Exception:
+                    logger.exception("Error parsing batch result %s of batch %s", custom_id, batch_id)
+        return batch.status, results
+
@@ -0,0 +1,158 @@
+import logging
+import math
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from backend.models.models import Event, Location
+
+logger = logging.getLogger(__name__)
+
+CONTINENTS = {
+    "AF": "Africa", "AS": "Asia", "EU": "Europe", "NA": "North America",
+    "OC": "Oceania", "SA": "South America", "AN": "Antarctica",
+}
+
+GAZETTEER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS countries (
+    name_lower TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    iso TEXT NOT NULL,
+    continent TEXT,
+    latitude REAL,
+    longitude REAL
+);
+CREATE TABLE IF NOT EXISTS cities (
+    name_lower TEXT NOT NULL,
+    name TEXT NOT NULL,
+    iso TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    population INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cities_name ON cities (name_lower, population DESC);
+"""
+
+
+def _centroid(vector: List[float]) -> tuple:
+    """Latitude and longitude of the direction of a summed unit vector (x, y, z)."""
+    x, y, z = vector
+    return math.degrees(math.atan2(z, math.hypot(x, y))), math.degrees(math.atan2(y, x))
+
+
+def build_gazetteer(cities_path: str, country_info_path: str, db_path: str):
+    """
+    Build the gazetteer database from the GeoNames dumps cities500.txt and countryInfo.txt
+    (https://download.geonames.org/export/dump/). Each country's coordinates are the centroid of
+    its places, averaged on the sphere so that countries spanning the antimeridian come out right.
+    """
+    cities = []
+    sums = {}
+    with open(cities_path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            latitude, longitude = float(cols[4]), float(cols[5])
+            cities.append((cols[1].lower(), cols[1], cols[8], latitude, longitude, int(cols[14] or 0)))
+            lat, lon = math.radians(latitude), math.radians(longitude)
+            vector = sums.setdefault(cols[8], [0.0, 0.0, 0.0])
+            vector[0] += math.cos(lat) * math.cos(lon)
+            vector[1] += math.cos(lat) * math.sin(lon)
+            vector[2] += math.sin(lat)
+
+    countries = []
+    with open(country_info_path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            latitude, longitude = _centroid(sums[cols[0]]) if cols[0] in sums else (None, None)
+            countries.append((cols[4].lower(), cols[4], cols[0], CONTINENTS.get(cols[8]), latitude, longitude))
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS countries")
+        conn.executescript(GAZETTEER_SCHEMA)
+        conn.executemany("INSERT OR REPLACE INTO countries VALUES (?, ?, ?, ?, ?, ?)", countries)
+        conn.execute("DELETE FROM cities")
+        conn.executemany("INSERT INTO cities VALUES (?, ?, ?, ?, ?, ?)", cities)
+    conn.close()
+
+
+class LocalGeocoder:
+    """
+    Resolve event locations offline: spaCy NER finds place names (GPE/LOC entities), which are
+    looked up in a GeoNames gazetteer, preferring countries and then the most populous city.
+    Enabled by setting LOCAL_GEOCODER_DB to a database created with build_gazetteer;
+    requires the optional `spacy` package and model (LOCAL_GEOCODER_SPACY_MODEL, default en_core_web_sm).
+    """
+
+    def __init__(self, db_path: str, spacy_model: str = "en_core_web_sm", batch_size: int = 64):
+        import spacy
+
+        self.nlp = spacy.load(spacy_model, disable=["lemmatizer", "tagger"])
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.batch_size = batch_size
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(countries)")}
+        if "latitude" not in columns:
+            raise ValueError(f"Gazetteer {db_path} has no country coordinates; rebuild it with build_gazetteer")
+
+    @classmethod
+    def from_env(cls) -> Optional["LocalGeocoder"]:
+        db_path = os.getenv("LOCAL_GEOCODER_DB")
+        if not db_path:
+            return None
+        if not Path(db_path).exists():
+            logger.warning("Gazetteer database %s not found, falling back to GPT for locations", db_path)
+            return None
+        try:
+            return cls(db_path, os.getenv("LOCAL_GEOCODER_SPACY_MODEL", "en_core_web_sm"))
+        except Exception:
+            logger.exception("Error loading local geocoder, falling back to GPT")
+            return None
+
+    def _resolve(self, name: str) -> Optional[Location]:
+        name_lower = name.lower()
+        with self.lock:
+            country = self.conn.execute(
+                "SELECT name, continent, latitude, longitude FROM countries WHERE name_lower = ?", (name_lower,)
+            ).fetchone()
+            if country:
+                # Countries without places have no centroid; they are left to the next entity or GPT,
+                # as the map only draws events with coordinates.
+                if country[2] is None:
+                    return None
+                return Location(geographic_scope=country[1], country=country[0], coordinates=[country[2], country[3]])
+            city = self.conn.execute(
+                "SELECT c.name, c.latitude, c.longitude, k.name, k.continent FROM cities c "
+                "LEFT JOIN countries k ON k.iso = c.iso "
+                "WHERE c.name_lower = ? ORDER BY c.population DESC LIMIT 1",
+                (name_lower,)
+            ).fetchone()
+        if city:
+            return Location(geographic_scope=city[4], country=city[3], city=city[0], coordinates=[city[1], city[2]])
+        return None
+
+    def locate(self, events: List[Event]) -> List[Optional[Location]]:
+        """
+        Return the location of each event, or None when no place name could be resolved.
+        """
+        texts = [f"{event.title}. {event.description}" for event in events]
+        locations: List[Optional[Location]] = []
+        for doc in self.nlp.pipe(texts, batch_size=self.batch_size):
+            location = None
+            for ent in doc.ents:
+                if ent.label_ in ("GPE", "LOC"):
+                    location = self._resolve(ent.text)
+                    if location:
+                        break
+            locations.append(location)
+        return locations
+
+
+if __name__ == "__main__":
+    # python -m backend.services.local_geocoder cities500.txt countryInfo.txt gazetteer.db
+    build_gazetteer(*sys.argv[1:4])
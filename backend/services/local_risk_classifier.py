@@ -0,0 +1,96 @@
+import logging
+import os
+from typing import Dict, List, Optional
+
+from backend.models.models import Event, Risk
+
+logger = logging.getLogger(__name__)
+
+# Classes and families of the Cambridge Risk Taxonomy, as used in the GPT classification prompt.
+RISK_TAXONOMY: Dict[str, List[str]] = {
+    "Financial": [
+        "Economic Outlook", "Economic Variables", "Market Crisis", "Trading Environment",
+        "Company Outlook", "Competition", "Counterparty",
+    ],
+    "Geopolitical": [
+        "Business Environment (Country Risk)", "Corruption & Crime", "Government Business Policy",
+        "Change in Government", "Political Violence", "Interstate Conflict",
+    ],
+    "Technology": ["Disruptive Technology", "Cyber", "Critical Infrastructure", "Industrial Accident"],
+    "Environmental": [
+        "Extreme Weather", "Geophysical", "Space", "Climate Change", "Environmental Degradation",
+        "Natural Resource Deficiency", "Food Security",
+    ],
+    "Social": [
+        "Socioeconomic Trends", "Human Capital", "Brand Perception", "Sustainable Living",
+        "Health Trends", "Infectious Disease",
+    ],
+    "Governance": [
+        "Non-Compliance", "Litigation", "Strategic Performance", "Management Performance",
+        "Business Model Deficiencies", "Pension Management", "Products & Services",
+    ],
+}
+
+CANDIDATE_LABELS: List[str] = [
+    f"{class_name}: {family}" for class_name, families in RISK_TAXONOMY.items() for family in families
+]
+
+# Families scoring at least this are assigned; events whose best score is below the fallback
+# threshold are left for GPT to classify.
+LABEL_THRESHOLD = 0.5
+FALLBACK_THRESHOLD = 0.3
+
+
+class LocalRiskClassifier:
+    """
+    Multi-label zero-shot classifier for the risk taxonomy, run locally in one batched pass.
+    Enabled by setting LOCAL_RISK_CLASSIFIER_MODEL (e.g. "MoritzLaurer/deberta-v3-base-zeroshot-v2");
+    requires the optional `transformers` package.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 16):
+        from transformers import pipeline
+
+        device = int(os.getenv("LOCAL_RISK_CLASSIFIER_DEVICE", "-1"))
+        self.classifier = pipeline("zero-shot-classification", model=model_name, device=device)
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_env(cls) -> Optional["LocalRiskClassifier"]:
+        model_name = os.getenv("LOCAL_RISK_CLASSIFIER_MODEL")
+        if not model_name:
+            return None
+        try:
+            return cls(model_name)
+        except Exception:
+            logger.exception("Error loading local risk classifier, falling back to GPT")
+            return None
+
+    def classify(self, events: List[Event]) -> List[Optional[List[Risk]]]:
+        """
+        Return the risks of each event, or None for events the model is not confident about.
+        """
+        if not events:
+            return []
+        texts = [f"{event.title}. {event.description}" for event in events]
+        results = self.classifier(texts, CANDIDATE_LABELS, multi_label=True, batch_size=self.batch_size)
+        if isinstance(results, dict):
+            results = [results]
+
+        risks_per_event: List[Optional[List[Risk]]] = []
+        for result in results:
+            if not result["scores"] or max(result["scores"]) < FALLBACK_THRESHOLD:
+                risks_per_event.append(None)
+                continue
+            families: Dict[str, List[str]] = {}
+            for label, score in zip(result["labels"], result["scores"]):
+                if score >= LABEL_THRESHOLD:
+                    class_name, family = label.split(": ", 1)
+                    families.setdefault(class_name, []).append(family)
+            if not families:
+                # Confident enough to skip GPT, but no family passed: keep the best class on its own.
+                families[result["labels"][0].split(": ", 1)[0]] = []
+            risks_per_event.append(
+                [Risk(class_name=class_name, families=names) for class_name, names in families.items()]
+            )
+        return risks_per_event
@@ -17,6 +17,7 @@ with st.sidebar:
 
         supply_chains = fetch_supply_chains()
         supply_chain_names = {sc["id"]: sc["companyName"] for sc in supply_chains}
+        supply_chain_ids = list(supply_chain_names)
 
         if "selected_supply_chain" not in st.session_state:
             try:
@@ -27,9 +28,9 @@ with st.sidebar:
 
         selected_supply_chain_id = st.selectbox(
             "Select Supply Chain",
-            options=supply_chain_names.keys(),
-            format_func=lambda x: supply_chain_names[x],
-            index=list(supply_chain_names.keys()).index(
+            options=supply_chain_ids,
+            format_func=supply_chain_names.__getitem__,
+            index=supply_chain_ids.index(
                 st.session_state.selected_supply_chain["id"]
             ) if st.session_state.selected_supply_chain else 0
         )
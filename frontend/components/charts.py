@@ -1,175 +1,203 @@
-from datetime import datetime
+import re
+from functools import lru_cache
+from io import BytesIO
+from typing import Optional
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-
-
-def get_risk_level(score: float) -> str:
-    if score < 0.10:
-        return "Very Low Risk"
-    elif score < 0.30:
-        return "Low Risk"
-    elif score < 0.55:
-        return "Medium Risk"
-    elif score < 0.75:
-        return "High Risk"
-    else:
-        return "Extreme Risk"
+import plotly.graph_objects as go
+import streamlit as st
+
+from components.risk_levels import RISK_LEVEL_COLORS, RISK_LEVEL_LABELS, get_risk_levels
+
+
+BROAD_RISK_CATEGORY_COLORS = {
+    "Financial": "#9B59B6",
+    "Geopolitical": "#34495E",
+    "Technology": "#16A085",
+    "Environmental": "#27AE60",
+    "Social": "#D35400",
+    "Governance": "#7F8C8D"
+}
+
+# Risk level label -> color, in level order.
+RISK_LEVEL_COLOR_MAP = dict(zip(RISK_LEVEL_LABELS.tolist(), RISK_LEVEL_COLORS.tolist()))
 
 
-def flatten_events(events: list) -> pd.DataFrame:
+# The word cloud only draws the most frequent subcategories; layout cost grows with every word placed.
+WORDCLOUD_MAX_WORDS = 200
+
+# Chart building is cached across Streamlit reruns while the counts are unchanged.
+_cache_charts = st.cache_data(show_spinner=False)
+
+
+@_cache_charts
+def create_overall_risk_donut_chart(level_counts: dict, total_events: int):
     """
-    Convert a list of event dictionaries into a flat Pandas DataFrame for visualization.
-    Each row represents one event with fields including:
-      - title, risk_score, risk_level,
-      - likelihood, impact,
-      - a concatenated string for risk categories (main and subcategories),
-      - a concatenated string for risk subcategories only,
-      - a formatted date, source, and description.
+    Donut of the events per overall risk level, from the by_level counts of the assessed event
+    aggregates; only the non-empty levels are passed to the pie, in level order.
     """
-    data = []
-    for e in events:
-        ra = e.get("risk_assessment", {})
-        risk_score = ra.get("risk_score")
-        # Compute overall risk level using the helper function if risk_score exists.
-        risk_level = get_risk_level(risk_score) if risk_score is not None else None
-        likelihood = ra.get("likelihood")
-        impact = ra.get("impact")
-
-        # Format the timestamp.
-        # Expected format is like "2025-01-11T13:00:00Z"; we remove the trailing "Z" and ignore the time part.
-        ts = e.get("timestamp", "")
-        try:
-            dt = datetime.datetime.fromisoformat(ts.replace("Z", ""))
-            formatted_date = dt.strftime("%d/%m/%Y")
-        except Exception:
-            formatted_date = ts  # fallback to the original timestamp
-
-        # Process risk categories:
-        # Create a concatenated string of main risk categories (with subcategories in parentheses)
-        risk_cats = ""
-        if e.get("risk_categories"):
-            risk_cats = ", ".join([
-                f"{r.get('class_name', '')}" +
-                (f" ({', '.join(r.get('families', []))})" if r.get("families") else "")
-                for r in e.get("risk_categories", [])
-            ])
-
-        # Process subcategories separately: extract all families from each risk.
-        risk_subcats = []
-        if e.get("risk_categories"):
-            for r in e.get("risk_categories", []):
-                families = r.get("families")
-                if families:
-                    risk_subcats.extend(families)
-        risk_subcats_str = ", ".join(risk_subcats) if risk_subcats else ""
-
-        data.append({
-            "title": e.get("title"),
-            "risk_score": risk_score,
-            "risk_level": risk_level,
-            "likelihood": likelihood,
-            "impact": impact,
-            "risk_categories": risk_cats,
-            "risk_subcategories": risk_subcats_str,  # New field for subcategories only.
-            "date": formatted_date,
-            "source": e.get("source_name", ""),
-            "description": e.get("description", "")
-        })
-
-    return pd.DataFrame(data)
-
-
-def create_overall_risk_donut_chart(df: pd.DataFrame, risk_level_colors: dict):
-    # Group by overall risk level and count events.
-    risk_counts = df['risk_level'].value_counts().reset_index()
-    risk_counts.columns = ['risk_level', 'count']
-    risk_level_order = ["Very Low Risk", "Low Risk", "Medium Risk", "High Risk", "Extreme Risk"]
-    risk_counts['risk_level'] = pd.Categorical(risk_counts['risk_level'],
-                                               categories=risk_level_order, ordered=True)
-    risk_counts = risk_counts.sort_values('risk_level')
-    total_events = int(df.shape[0])
-
-    fig = px.pie(
-        risk_counts,
-        values='count',
-        names='risk_level',
+    levels = [(label, level_counts[label]) for label in RISK_LEVEL_LABELS if level_counts.get(label)]
+
+    fig = go.Figure(go.Pie(
+        labels=[label for label, _ in levels],
+        values=[n for _, n in levels],
         hole=0.5,
-        color='risk_level',
-        color_discrete_map=risk_level_colors,
-        title="Event Count by Overall Risk Level"
-    )
+        marker_colors=[RISK_LEVEL_COLOR_MAP[label] for label, _ in levels],
+    ))
     fig.update_layout(
+        title="Event Count by Overall Risk Level",
         annotations=[dict(text=f"{total_events}", x=0.5, y=0.5, font_size=20, showarrow=False)]
     )
     return fig
 
 
-def create_broad_risk_donut_chart(df: pd.DataFrame, all_risk_categories: list):
-    # Extract broad risk categories from the risk_categories column.
-    risk_list = []
-    for idx, row in df.iterrows():
-        if row['risk_categories']:
-            cats = [cat.strip() for cat in row['risk_categories'].split(",")]
-            for cat in cats:
-                for broad in all_risk_categories:
-                    if broad.lower() in cat.lower():
-                        risk_list.append(broad)
-                        break
-    if risk_list:
-        df_risk = pd.DataFrame(risk_list, columns=['risk_category'])
-        cat_counts = df_risk['risk_category'].value_counts().reset_index()
-        cat_counts.columns = ['risk_category', 'count']
-        order = all_risk_categories
-        cat_counts['risk_category'] = pd.Categorical(cat_counts['risk_category'], categories=order, ordered=True)
-        cat_counts = cat_counts.sort_values('risk_category')
-    else:
-        cat_counts = pd.DataFrame(columns=['risk_category', 'count'])
+@lru_cache(maxsize=8)
+def _broad_category_matcher(all_risk_categories: tuple):
+    """Compiled alternation of the lowercased broad categories and each one's position in the list."""
+    lowered = [broad.lower() for broad in all_risk_categories]
+    # Longest first, so that a category contained in another one does not shadow it
+    pattern = re.compile("|".join(re.escape(b) for b in sorted(set(lowered), key=len, reverse=True)))
+    ranks = {}
+    for rank, b in enumerate(lowered):
+        ranks.setdefault(b, rank)
+    return pattern, ranks
+
 
-    fig = px.pie(
-        cat_counts,
-        values='count',
-        names='risk_category',
+@_cache_charts
+def create_broad_risk_donut_chart(class_counts: dict, all_risk_categories: Optional[list] = None):
+    """
+    Donut of the risks per broad risk category, from the by_class counts of the assessed event
+    aggregates: each risk class counts towards the first broad category (in list order) it mentions.
+    The categories default to those of BROAD_RISK_CATEGORY_COLORS.
+    """
+    if all_risk_categories is None:
+        all_risk_categories = list(BROAD_RISK_CATEGORY_COLORS)
+    pattern, ranks = _broad_category_matcher(tuple(all_risk_categories))
+    rank_counts = [0] * len(all_risk_categories)
+    for class_name, n in class_counts.items():
+        found = [ranks[match] for match in pattern.findall(class_name.lower())]
+        if found:
+            rank_counts[min(found)] += n
+    # Keep list order and skip empty categories.
+    categories = [(category, n) for category, n in zip(all_risk_categories, rank_counts) if n]
+    total_cat_events = sum(n for _, n in categories)
+
+    fig = go.Figure(go.Pie(
+        labels=[category for category, _ in categories],
+        values=[n for _, n in categories],
         hole=0.5,
-        color='risk_category',
-        color_discrete_map={
-            "Financial": "#9B59B6",
-            "Geopolitical": "#34495E",
-            "Technology": "#16A085",
-            "Environmental": "#27AE60",
-            "Social": "#D35400",
-            "Governance": "#7F8C8D"
-        },
-        title="Event Count by Broad Risk Category"
-    )
-    total_cat_events = cat_counts['count'].sum() if not cat_counts.empty else 0
+        marker_colors=[BROAD_RISK_CATEGORY_COLORS.get(category) for category, _ in categories],
+    ))
     fig.update_layout(
+        title="Event Count by Broad Risk Category",
         annotations=[dict(text=f"{total_cat_events}", x=0.5, y=0.5, font_size=20, showarrow=False)]
     )
     return fig
 
 
-def create_risk_subcategory_wordcloud(events: list, df: pd.DataFrame):
-    # Build a frequency dictionary from the "risk_subcategories" column in the flattened DataFrame.
-    subcat_freq = {}
-    for subcats in df["risk_subcategories"]:
-        if subcats:
-            for subcat in subcats.split(","):
-                subcat = subcat.strip()
-                if subcat:
-                    subcat_freq[subcat] = subcat_freq.get(subcat, 0) + 1
+@st.cache_data(show_spinner=False)
+def _wordcloud_png(freq_items: tuple) -> bytes:
+    """Render the word cloud for (subcategory, count) pairs as PNG bytes; cached per frequency set."""
+    # Imported here because wordcloud loads matplotlib, which only the first render should pay for.
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color="white",
+        colormap="viridis"
+    ).generate_from_frequencies(dict(freq_items))
+    buffer = BytesIO()
+    wordcloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@_cache_charts
+def create_risk_subcategory_wordcloud(subcategory_counts: dict) -> Optional[bytes]:
+    """
+    Build the risk subcategory word cloud from the subcategory_counts of the assessed event
+    aggregates. Returns PNG bytes for st.image, or None if there are no subcategories.
+    """
+    subcat_freq = sorted(subcategory_counts.items(), key=lambda item: item[1], reverse=True)[:WORDCLOUD_MAX_WORDS]
     if subcat_freq:
-        wordcloud = WordCloud(
-            width=800,
-            height=400,
-            background_color="white",
-            colormap="viridis"
-        ).generate_from_frequencies(subcat_freq)
-        fig_wc, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wordcloud, interpolation="bilinear")
-        ax.axis("off")
-        return fig_wc
+        return _wordcloud_png(tuple(sorted(subcat_freq)))
     else:
         return None
+
+
+def _risk_scores_frame(scores: tuple) -> pd.DataFrame:
+    categories = np.fromiter((category for category, _ in scores), dtype=object, count=len(scores))
+    values = np.fromiter((score for _, score in scores), dtype=np.float64, count=len(scores)).round(2)
+    return pd.DataFrame({"Category": categories, "Score": values})
+
+
+@st.cache_data(show_spinner=False)
+def create_risk_score_radar_chart(scores: tuple) -> go.Figure:
+    """
+    Spider chart of the (category, score) pairs of a Bayesian risk score, written out as the
+    scatterpolar figure spec that px.line_polar would build, without Plotly Express's trace expansion.
+    """
+    df = _risk_scores_frame(scores)
+    categories = df["Category"].tolist()
+    values = df["Score"].tolist()
+    # Repeat the first point to close the outline.
+    categories += categories[:1]
+    values += values[:1]
+    return go.Figure({
+        "data": [{
+            "type": "scatterpolar",
+            "r": values,
+            "theta": categories,
+            "customdata": values,
+            "hovertext": categories,
+            "hovertemplate": "<b>%{hovertext}</b><br><br>Score=%{customdata}<br>Category=%{theta}<extra></extra>",
+            "mode": "lines+markers",
+            "fill": "toself",
+            "hoveron": "points+fills",
+            "name": "",
+            "showlegend": False,
+        }],
+        "layout": {
+            "polar": {
+                "angularaxis": {"direction": "clockwise", "rotation": 90},
+                "radialaxis": {"range": [0, 1]},
+            },
+            "margin": {"t": 60},
+        },
+    })
+
+
+# Bar color scale of the risk levels: one color per level label, looked up directly by Vega.
+RISK_LEVEL_COLOR_SCALE = {"domain": RISK_LEVEL_LABELS.tolist(), "range": RISK_LEVEL_COLORS.tolist()}
+
+
+@st.cache_data(show_spinner=False)
+def create_risk_score_bar_chart(scores: tuple) -> dict:
+    """
+    Vega-Lite spec of a bar chart of the (category, score) pairs of a Bayesian risk score, colored
+    by risk level; written out as a plain dict rather than built (and validated) through Altair.
+    """
+    df = _risk_scores_frame(scores)
+    df["Risk Level"] = get_risk_levels(df["Score"].to_numpy())
+    return {
+        "data": {"values": df.to_dict("records")},
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Category", "type": "nominal", "sort": None},
+            "y": {"field": "Score", "type": "quantitative", "scale": {"domain": [0, 1]}},
+            "color": {
+                "field": "Risk Level",
+                "type": "nominal",
+                "scale": RISK_LEVEL_COLOR_SCALE,
+                "legend": {"title": "Risk Level"}
+            },
+            "tooltip": [
+                {"field": "Category", "type": "nominal"},
+                {"field": "Score", "type": "quantitative", "format": ".2f"},
+                {"field": "Risk Level", "type": "nominal"}
+            ]
+        },
+        "width": 800,
+        "height": 400
+    }
@@ -1,29 +1,8 @@
 import streamlit as st
 
+from components.risk_levels import classify
 from utils.api_client import delete_event
 
-def get_risk_level(score: float) -> str:
-    if score < 0.10:
-        return "Very Low Risk"
-    elif score < 0.30:
-        return "Low Risk"
-    elif score < 0.55:
-        return "Medium Risk"
-    elif score < 0.75:
-        return "High Risk"
-    else:
-        return "Extreme Risk"
-
-
-# Updated color mapping for overall risk level tags.
-risk_level_colors = {
-    "Very Low Risk": "#3498DB",  # Blue
-    "Low Risk": "#2ECC71",  # Green
-    "Medium Risk": "#F1C40F",  # Yellow
-    "High Risk": "#E67E22",  # Orange
-    "Extreme Risk": "#C0392B"  # Dark Red
-}
-
 # Define dropdown options for Likelihood and Impact
 LIKELIHOOD_OPTIONS = {
     "Rare (0.001)": 0.001,
@@ -41,6 +20,15 @@ IMPACT_OPTIONS = {
     "Catastrophic (0.9)": 0.9
 }
 
+# Option labels, label positions and value -> label lookups, built once instead of on every dialog rerun.
+_LIKELIHOOD_LABELS = tuple(LIKELIHOOD_OPTIONS)
+_LIKELIHOOD_INDEX = {label: i for i, label in enumerate(_LIKELIHOOD_LABELS)}
+_LIKELIHOOD_BY_VALUE = {value: label for label, value in LIKELIHOOD_OPTIONS.items()}
+
+_IMPACT_LABELS = tuple(IMPACT_OPTIONS)
+_IMPACT_INDEX = {label: i for i, label in enumerate(_IMPACT_LABELS)}
+_IMPACT_BY_VALUE = {value: label for label, value in IMPACT_OPTIONS.items()}
+
 ALL_RISK_CATEGORIES = {
     "Financial": [
         "Economic Outlook", "Economic Variables", "Market Crisis", "Trading Environment",
@@ -105,18 +93,16 @@ def edit_event_dialog(event):
         # Likelihood and Impact selection (side by side)
         col1, col2 = st.columns(2)
         with col1:
-            likelihood_label = next((k for k, v in LIKELIHOOD_OPTIONS.items() if
-                                     v == event.get("risk_assessment", {}).get("likelihood", 0.1)), "Possible (0.1)")
-            selected_likelihood = st.selectbox("Likelihood", options=LIKELIHOOD_OPTIONS.keys(),
-                                               index=list(LIKELIHOOD_OPTIONS.keys()).index(likelihood_label))
+            likelihood_label = _LIKELIHOOD_BY_VALUE.get(event.get("risk_assessment", {}).get("likelihood", 0.1),
+                                                        "Possible (0.1)")
+            selected_likelihood = st.selectbox("Likelihood", options=_LIKELIHOOD_LABELS,
+                                               index=_LIKELIHOOD_INDEX[likelihood_label])
             likelihood_value = LIKELIHOOD_OPTIONS[selected_likelihood]
 
         with col2:
-            impact_label = next(
-                (k for k, v in IMPACT_OPTIONS.items() if v == event.get("risk_assessment", {}).get("impact", 0.1)),
-                "Moderate (0.1)")
-            selected_impact = st.selectbox("Impact", options=IMPACT_OPTIONS.keys(),
-                                           index=list(IMPACT_OPTIONS.keys()).index(impact_label))
+            impact_label = _IMPACT_BY_VALUE.get(event.get("risk_assessment", {}).get("impact", 0.1), "Moderate (0.1)")
+            selected_impact = st.selectbox("Impact", options=_IMPACT_LABELS,
+                                           index=_IMPACT_INDEX[impact_label])
             impact_value = IMPACT_OPTIONS[selected_impact]
 
         # Compute Risk Score
@@ -127,8 +113,7 @@ def edit_event_dialog(event):
         editable_event["risk_assessment"]["risk_score"] = normalized_risk
 
         # Determine the risk level
-        overall_risk_level = get_risk_level(normalized_risk)
-        overall_color = risk_level_colors.get(overall_risk_level, "gray")
+        overall_risk_level, overall_color = classify(normalized_risk)
 
         # Display calculated risk score with color-coded tag
         st.markdown(
@@ -0,0 +1,38 @@
+from bisect import bisect_right
+from typing import Tuple
+
+import numpy as np
+
+# Upper bounds (exclusive) of each normalized risk score level, and the level labels and colors.
+RISK_LEVEL_THRESHOLDS = np.array([0.10, 0.30, 0.55, 0.75])
+RISK_LEVEL_LABELS = np.array(["Very Low Risk", "Low Risk", "Medium Risk", "High Risk", "Extreme Risk"], dtype=object)
+RISK_LEVEL_COLORS = np.array([
+    "#3498DB",  # Very Low Risk: Blue
+    "#2ECC71",  # Low Risk: Green
+    "#F1C40F",  # Medium Risk: Yellow
+    "#E67E22",  # High Risk: Orange
+    "#C0392B",  # Extreme Risk: Dark Red
+], dtype=object)
+
+# Plain tuples for scalar lookups, which bisect faster than numpy handles single values.
+_THRESHOLDS = tuple(RISK_LEVEL_THRESHOLDS.tolist())
+_LABELS = tuple(RISK_LEVEL_LABELS.tolist())
+_COLORS = tuple(RISK_LEVEL_COLORS.tolist())
+
+
+def classify(score: float) -> Tuple[str, str]:
+    """Return the risk level label and color of a normalized risk score."""
+    idx = bisect_right(_THRESHOLDS, score)
+    return _LABELS[idx], _COLORS[idx]
+
+
+def get_risk_level(score: float) -> str:
+    return _LABELS[bisect_right(_THRESHOLDS, score)]
+
+
+def get_risk_levels(scores) -> np.ndarray:
+    """Vectorised get_risk_level: the risk level of each score, or None where the score is missing."""
+    scores = np.asarray(scores, dtype=float)
+    levels = RISK_LEVEL_LABELS[np.searchsorted(RISK_LEVEL_THRESHOLDS, scores, side="right")]
+    levels[np.isnan(scores)] = None
+    return levels
@@ -7,24 +7,23 @@ THIS_DIR = os.path.dirname(__file__)                              # .../frontend
 FRONTEND_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))     # .../frontend
 sys.path.insert(0, FRONTEND_ROOT)
 
+import json
 import re
 from datetime import date, timedelta
+from pathlib import Path
 
 import streamlit as st
-from pages.events_news import fetch_and_store_events
-from utils.tools import assess_and_store_events, load_assessed_events_to_map
-
-import smolagents
-from smolagents import CodeAgent, tool
-from smolagents.models import HfApiModel
 
 import ast
 
 # ─── 1. Load system prompt from prompts.yaml ────────────────────────────────────
 
 PROMPT_PATH = os.path.join(os.path.dirname(__file__), "prompts.yaml")
-with open(PROMPT_PATH, "r") as f:
-    system_prompt = f.read().strip()
+
+
+@st.cache_resource
+def _load_prompt() -> str:
+    return Path(PROMPT_PATH).read_text().strip()
 
 # ─── 2. Define the single agent tool ─────────────────────────────────────────────
 
@@ -32,20 +31,55 @@ os.environ["HF_TOKEN"]="hf_XXXXXXXXXXXXXXXXXXXX"
 
 # ─── 3. Instantiate the agent ───────────────────────────────────────────────────
 
-# Initialize your LLM model (Hugging Face endpoint, etc.)
-model = HfApiModel(
-    max_tokens=2096,
-    temperature=0.5,
-    model_id="Qwen/Qwen2.5-Coder-32B-Instruct",
-    custom_role_conversions=None,
-)
-
-
-# Build the agent with our single tool
-agent = CodeAgent(
-    model=model,
-    tools=[fetch_and_store_events, assess_and_store_events, load_assessed_events_to_map]
-)
+# Streamlit reruns this page on every interaction, so the model client is built once per
+# process, on the first run, rather than at import. smolagents and the tool modules are imported
+# below too, so the page itself loads without them.
+@st.cache_resource
+def _build_model():
+    from smolagents.models import HfApiModel
+
+    # Initialize your LLM model (Hugging Face endpoint, etc.)
+    return HfApiModel(
+        max_tokens=2096,
+        temperature=0.5,
+        model_id="Qwen/Qwen2.5-Coder-32B-Instruct",
+        custom_role_conversions=None,
+    )
+
+
+def _build_agent():
+    # The agent keeps its memory and steps between calls, so each run gets its own instead of
+    # sharing one across sessions.
+    from pages.events_news import fetch_and_store_events
+    from smolagents import CodeAgent
+    from utils.tools import assess_and_store_events, load_assessed_events_to_map
+
+    # Build the agent with our single tool
+    return CodeAgent(
+        model=_build_model(),
+        tools=[fetch_and_store_events, assess_and_store_events, load_assessed_events_to_map]
+    )
+
+
+_CODE_FENCE_RE = re.compile(r"^```(?:json|python)?\s*|\s*```$")
+
+
+def _parse_agent_output(raw):
+    """
+    Parse the agent's final answer into a dict where possible: code fences are stripped, then
+    json.loads is tried before the slower ast.literal_eval. Anything unparseable is returned as is.
+    """
+    if not isinstance(raw, str):
+        return raw
+    text = _CODE_FENCE_RE.sub("", raw.strip())
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except Exception:
+        return raw
 
 # ─── 4. Streamlit UI integration ────────────────────────────────────────────────
 
@@ -56,14 +90,11 @@ user_prompt = st.text_input(
 )
 
 if st.button("Run Agent"):
-    full_prompt = f"{system_prompt}\nTask: \"{user_prompt}\""
-    raw = agent(full_prompt)
+    full_prompt = f"{_load_prompt()}\nTask: \"{user_prompt}\""
+    raw = _build_agent()(full_prompt)
 
     # Try to parse the raw output into a dict
-    try:
-        result = ast.literal_eval(raw)
-    except Exception:
-        result = raw
+    result = _parse_agent_output(raw)
 
     # If it’s a dict, display its fields
     if isinstance(result, dict):
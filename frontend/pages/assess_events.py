@@ -1,7 +1,10 @@
 import streamlit as st
 import datetime
 
+import pandas as pd
+
 from components.event_edit_popup import edit_event_dialog
+from components.risk_levels import get_risk_level, get_risk_levels
 from utils.api_client import assess_unassessed_events, fetch_assessed_events, update_event
 
 # Initialize session state for alerts
@@ -21,15 +24,18 @@ It's typically **Step 2** of the workflow, following the "Events & News" page.
 """)
 
 # Ensure that a supply chain is selected
+supply_chain_id = None
 if 'selected_supply_chain' not in st.session_state or not st.session_state.selected_supply_chain:
     st.error("No supply chain selected. Please select a supply chain first.")
 else:
     supply_chain_id = st.session_state.selected_supply_chain["id"]
 
-# Automatically load assessed events when the page loads
-if "alerts" not in st.session_state or st.session_state.alerts_source != "existing":
+# Automatically load assessed events once per selected supply chain, not on every rerun (which would
+# also replace freshly assessed events with the stored ones on the next widget interaction)
+if supply_chain_id is not None and st.session_state.get("assessed_loaded_sc") != supply_chain_id:
     try:
         assessed_events = fetch_assessed_events(supply_chain_id=supply_chain_id)
+        st.session_state.assessed_loaded_sc = supply_chain_id
         if not assessed_events:
             st.info("No assessed events found for this supply chain.")
         else:
@@ -57,45 +63,6 @@ LIKELIHOOD_OPTIONS = ["Rare", "Unlikely", "Possible", "Likely", "Almost Certain"
 IMPACT_OPTIONS = ["Insignificant", "Minor", "Moderate", "Major", "Catastrophic"]
 RISK_LEVEL_OPTIONS = ["Low Risk", "Moderate Risk", "High Risk", "Extreme Risk"]
 
-# Add an expandable filter panel including risk category, likelihood, impact, and overall risk level
-with st.expander("Filter Events", expanded=False):
-    st.multiselect(
-        "Select Risk Categories:",
-        options=ALL_RISK_CATEGORIES,
-        default=st.session_state.get("selected_risk_categories", ALL_RISK_CATEGORIES),
-        key="selected_risk_categories"
-    )
-    if 'selected_likelihood' not in st.session_state:
-        st.session_state.selected_likelihood = LIKELIHOOD_OPTIONS
-    if 'selected_impact' not in st.session_state:
-        st.session_state.selected_impact = IMPACT_OPTIONS
-    if 'selected_risk_levels' not in st.session_state:
-        st.session_state.selected_risk_levels = RISK_LEVEL_OPTIONS
-
-    st.multiselect(
-        "Select Likelihood Ratings:",
-        options=LIKELIHOOD_OPTIONS,
-        default=st.session_state.selected_likelihood,
-        key="selected_likelihood"
-    )
-    st.multiselect(
-        "Select Impact Ratings:",
-        options=IMPACT_OPTIONS,
-        default=st.session_state.selected_impact,
-        key="selected_impact"
-    )
-    st.multiselect(
-        "Select Overall Risk Levels:",
-        options=RISK_LEVEL_OPTIONS,
-        default=st.session_state.selected_risk_levels,
-        key="selected_risk_levels"
-    )
-
-sort_option = st.selectbox(
-    "Sort events by:",
-    ["Risk Score (high to low)", "Timestamp (newest first)", "Timestamp (oldest first)"]
-)
-
 reverse_likelihood = {
     0.001: "Rare",
     0.01: "Unlikely",
@@ -112,19 +79,6 @@ reverse_impact = {
 }
 
 
-def get_risk_level(score: float) -> str:
-    if score < 0.10:
-        return "Very Low Risk"
-    elif score < 0.30:
-        return "Low Risk"
-    elif score < 0.55:
-        return "Medium Risk"
-    elif score < 0.75:
-        return "High Risk"
-    else:
-        return "Extreme Risk"
-
-
 risk_level_colors = {
     "Very Low Risk": "#3498DB",  # Blue
     "Low Risk": "#2ECC71",  # Green
@@ -133,164 +87,255 @@ risk_level_colors = {
     "Extreme Risk": "#C0392B"  # Dark Red
 }
 
-if st.session_state.alerts:
-    filtered_events = [
-        event for event in st.session_state.alerts
-        if event.get("risk_assessment") is not None
-           and event["risk_assessment"].get("is_relevant")
-           and any(risk["class_name"] in st.session_state.selected_risk_categories
-                   for risk in event.get("risk_categories", []))
-           and (reverse_likelihood.get(event["risk_assessment"].get("likelihood"), str(event["risk_assessment"].get("likelihood"))) in st.session_state.selected_likelihood)
-           and (reverse_impact.get(event["risk_assessment"].get("impact"), str(event["risk_assessment"].get("impact"))) in st.session_state.selected_impact)
-           and (get_risk_level(event["risk_assessment"].get("risk_score", 0)) in st.session_state.selected_risk_levels)
-    ]
-
-    if sort_option == "Risk Score (high to low)":
-        filtered_events = sorted(filtered_events, key=lambda e: e["risk_assessment"].get("risk_score", 0), reverse=True)
-    elif sort_option == "Timestamp (newest first)":
-        filtered_events = sorted(
-            filtered_events,
-            key=lambda e: datetime.datetime.fromisoformat(e["timestamp"].replace("Z", "")).date(),
-            reverse=True
-        )
-    elif sort_option == "Timestamp (oldest first)":
-        filtered_events = sorted(
-            filtered_events,
-            key=lambda e: datetime.datetime.fromisoformat(e["timestamp"].replace("Z", "")).date()
-        )
-else:
-    filtered_events = []
+LIKELIHOOD_COLORS = {
+    "Rare": "#3498DB",
+    "Unlikely": "#2ECC71",
+    "Possible": "#F1C40F",
+    "Likely": "#E67E22",
+    "Almost Certain": "#C0392B"
+}
+IMPACT_COLORS = {
+    "Insignificant": "#3498DB",
+    "Minor": "#2ECC71",
+    "Moderate": "#F1C40F",
+    "Major": "#E67E22",
+    "Catastrophic": "#C0392B"
+}
+
+TAG_TEMPLATE = (
+    '<span style="background-color: {color}; padding: 4px 8px; border-radius: 4px; '
+    'color: white; font-weight: bold;">{label}</span>'
+)
+
 
-# Display filtered events
-if filtered_events:
-    if st.session_state.selected_risk_categories == ALL_RISK_CATEGORIES:
-        st.write(f"### Events for: {st.session_state.alerts_source.capitalize()}")
+def render_event(event):
+    """
+    Return the markdown of an event's card (rendered in one markdown call, one element/delta instead
+    of one per line) and its source line; only these and the Edit button need their own widgets.
+    """
+    risk_assessment = event.get("risk_assessment") or {}
+    title = event["title"]
+    description = event.get("description", "No description available.")
+    source = event.get("source_name", "Unknown")
+    try:
+        dt = datetime.datetime.fromisoformat(event["timestamp"].replace("Z", ""))
+        formatted_date = dt.strftime("%d/%m/%Y")
+    except Exception as e:
+        formatted_date = event["timestamp"]
+
+    url = event.get("url", "#")
+    likelihood = risk_assessment.get("likelihood")
+    impact = risk_assessment.get("impact")
+    reason = risk_assessment.get("reason", "")
+    stored_risk = risk_assessment.get("risk_score") or 0
+    overall_risk_level = get_risk_level(stored_risk)
+
+    parts = [f"### [{title}]({url})"]
+
+    risk_categories = event.get("risk_categories", [])
+    if risk_categories:
+        formatted_risks = [
+            f"{risk['class_name']}" + (f": {', '.join(risk.get('families', []))}" if risk.get("families") else "")
+            for risk in risk_categories
+        ]
+        parts.append(f"**Risk Categories:** {', '.join(formatted_risks)}")
     else:
-        st.write(f"### Filtered Events for: {st.session_state.alerts_source.capitalize()}")
-    st.write("---")
-    for event in filtered_events:
-        risk_assessment = event["risk_assessment"]
-        title = event["title"]
-        description = event.get("description", "No description available.")
-        source = event.get("source_name", "Unknown")
-        try:
-            dt = datetime.datetime.fromisoformat(event["timestamp"].replace("Z", ""))
-            formatted_date = dt.strftime("%d/%m/%Y")
-        except Exception as e:
-            formatted_date = event["timestamp"]
-
-        url = event.get("url", "#")
-        likelihood = risk_assessment["likelihood"]
-        impact = risk_assessment["impact"]
-        reason = risk_assessment["reason"]
-        stored_risk = risk_assessment.get("risk_score", 0)
-        overall_risk_level = get_risk_level(stored_risk)
-
-        st.subheader(f"[{title}]({url})")
-
-        risk_categories = event.get("risk_categories", [])
-        if risk_categories:
-            formatted_risks = [
-                f"{risk['class_name']}" + (f": {', '.join(risk.get('families', []))}" if risk.get("families") else "")
-                for risk in risk_categories
-            ]
-            st.markdown(f"**Risk Categories:** {', '.join(formatted_risks)}")
-        else:
-            st.markdown("**Risk Categories:** Not categorized")
-
-        st.write(f"**Description:** {description}")
-
-        likelihood_label = reverse_likelihood.get(likelihood, f"{likelihood}")
-        impact_label = reverse_impact.get(impact, f"{impact}")
-
-        likelihood_colors = {
-            "Rare": "#3498DB",
-            "Unlikely": "#2ECC71",
-            "Possible": "#F1C40F",
-            "Likely": "#E67E22",
-            "Almost Certain": "#C0392B"
-        }
-        impact_colors = {
-            "Insignificant": "#3498DB",
-            "Minor": "#2ECC71",
-            "Moderate": "#F1C40F",
-            "Major": "#E67E22",
-            "Catastrophic": "#C0392B"
-        }
-
-        color_likelihood = likelihood_colors.get(likelihood_label, "gray")
-        color_impact = impact_colors.get(impact_label, "gray")
-
-        likelihood_tag = f"""<span style="
-            background-color: {color_likelihood};
-            padding: 4px 8px;
-            border-radius: 4px;
-            color: white;
-            font-weight: bold;
-        ">{likelihood_label}</span>"""
-        impact_tag = f"""<span style="
-            background-color: {color_impact};
-            padding: 4px 8px;
-            border-radius: 4px;
-            color: white;
-            font-weight: bold;
-        ">{impact_label}</span>"""
-
-        overall_color = risk_level_colors.get(overall_risk_level, "gray")
-        overall_tag = f"""<span style="
-            background-color: {overall_color};
-            padding: 4px 8px;
-            border-radius: 4px;
-            color: white;
-            font-weight: bold;
-        ">{overall_risk_level}</span>"""
-
-        st.markdown(
-            f"""
-            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 16px;">
-              <div>
-                <strong>Likelihood:</strong> {likelihood_tag} &emsp; <strong>Impact:</strong> {impact_tag}
-              </div>
-              <div>
-                <strong>Risk Level:</strong> {overall_tag}
-              </div>
-            </div>
-            """,
-            unsafe_allow_html=True
+        parts.append("**Risk Categories:** Not categorized")
+
+    parts.append(f"**Description:** {description}")
+
+    likelihood_label = reverse_likelihood.get(likelihood, f"{likelihood}")
+    impact_label = reverse_impact.get(impact, f"{impact}")
+
+    likelihood_tag = TAG_TEMPLATE.format(label=likelihood_label, color=LIKELIHOOD_COLORS.get(likelihood_label, "gray"))
+    impact_tag = TAG_TEMPLATE.format(label=impact_label, color=IMPACT_COLORS.get(impact_label, "gray"))
+    overall_tag = TAG_TEMPLATE.format(label=overall_risk_level,
+                                      color=risk_level_colors.get(overall_risk_level, "gray"))
+
+    parts.append(
+        '<div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 16px;">'
+        f"<div><strong>Likelihood:</strong> {likelihood_tag} &emsp; <strong>Impact:</strong> {impact_tag}</div>"
+        f"<div><strong>Risk Level:</strong> {overall_tag}</div>"
+        "</div>"
+    )
+
+    parts.append(f"*{reason}*")
+
+    return "\n\n".join(parts), f"**Source:** {source} &emsp; **Published At:** {formatted_date}"
+
+
+def get_alerts_frame(events):
+    """
+    Return a DataFrame with the fields the filters and sorts use and the rendered card of each event,
+    one row per event, built once per loaded list of events (kept in session state alongside the list,
+    and not on the events, which are sent back on edit).
+    """
+    cached = st.session_state.get("alerts_frame")
+    if cached is None or cached[0] is not events:
+        # One pass over the events, with each event's assessment looked up once.
+        is_relevant, categories, likelihoods, impacts, scores, dates, fragments = [], [], [], [], [], [], []
+        for event in events:
+            ra = event.get("risk_assessment") or {}
+            likelihood = ra.get("likelihood")
+            impact = ra.get("impact")
+            is_relevant.append(bool(ra.get("is_relevant")))
+            categories.append(frozenset(risk["class_name"] for risk in event.get("risk_categories", [])))
+            likelihoods.append(reverse_likelihood.get(likelihood, str(likelihood)))
+            impacts.append(reverse_impact.get(impact, str(impact)))
+            scores.append(ra.get("risk_score", 0))
+            dates.append(event["timestamp"][:10])
+            # The rendered card of each event, so reruns only emit the visible cards.
+            fragments.append(render_event(event))
+        scores = pd.to_numeric(pd.Series(scores, dtype=object)).fillna(0)
+        frame = pd.DataFrame({
+            "is_relevant": is_relevant,
+            "categories": categories,
+            "likelihood": likelihoods,
+            "impact": impacts,
+            "risk_level": get_risk_levels(scores.to_numpy(dtype=float)),
+            "risk_score": scores,
+            "date": dates,
+            "fragments": fragments,
+        })
+        cached = (events, frame)
+        st.session_state.alerts_frame = cached
+    return cached[1]
+
+
+@st.fragment
+def filters_and_events(alerts):
+    """
+    The filter panel and the filtered events, rerun on their own when a filter, the sort or an Edit
+    button changes, without rerunning the fetches above.
+    """
+    # Add an expandable filter panel including risk category, likelihood, impact, and overall risk level
+    with st.expander("Filter Events", expanded=False):
+        st.multiselect(
+            "Select Risk Categories:",
+            options=ALL_RISK_CATEGORIES,
+            default=st.session_state.get("selected_risk_categories", ALL_RISK_CATEGORIES),
+            key="selected_risk_categories"
+        )
+        if 'selected_likelihood' not in st.session_state:
+            st.session_state.selected_likelihood = LIKELIHOOD_OPTIONS
+        if 'selected_impact' not in st.session_state:
+            st.session_state.selected_impact = IMPACT_OPTIONS
+        if 'selected_risk_levels' not in st.session_state:
+            st.session_state.selected_risk_levels = RISK_LEVEL_OPTIONS
+
+        st.multiselect(
+            "Select Likelihood Ratings:",
+            options=LIKELIHOOD_OPTIONS,
+            default=st.session_state.selected_likelihood,
+            key="selected_likelihood"
+        )
+        st.multiselect(
+            "Select Impact Ratings:",
+            options=IMPACT_OPTIONS,
+            default=st.session_state.selected_impact,
+            key="selected_impact"
+        )
+        st.multiselect(
+            "Select Overall Risk Levels:",
+            options=RISK_LEVEL_OPTIONS,
+            default=st.session_state.selected_risk_levels,
+            key="selected_risk_levels"
         )
 
-        st.write(f"*{reason}*")
+    sort_option = st.selectbox(
+        "Sort events by:",
+        ["Risk Score (high to low)", "Timestamp (newest first)", "Timestamp (oldest first)"]
+    )
 
-        col1, col2 = st.columns([0.85, 0.15])
-        with col1:
-            st.write(f"**Source:** {source} &emsp; **Published At:** {formatted_date}")
-        with col2:
-            with st.container():
-                if st.button("✏️ Edit", key=f"edit_{event['id']}"):
-                    edit_event_dialog(event)
+    filters_selected = (
+        st.session_state.selected_risk_categories
+        and st.session_state.selected_likelihood
+        and st.session_state.selected_impact
+        and st.session_state.selected_risk_levels
+    )
 
+    # A cleared filter matches nothing, so the events are not scanned at all.
+    if alerts and filters_selected:
+        frame = get_alerts_frame(alerts)
+        selected_categories = frozenset(st.session_state.selected_risk_categories)
+        mask = (
+            frame["is_relevant"]
+            & ~frame["categories"].map(selected_categories.isdisjoint).astype(bool)
+            & frame["likelihood"].isin(st.session_state.selected_likelihood)
+            & frame["impact"].isin(st.session_state.selected_impact)
+            & frame["risk_level"].isin(st.session_state.selected_risk_levels)
+        )
+        filtered = frame[mask]
+
+        # Stable sorts, so events that tie keep their loaded order.
+        if sort_option == "Risk Score (high to low)":
+            filtered = filtered.sort_values("risk_score", ascending=False, kind="stable")
+        # ISO 8601 dates sort lexicographically, so the "YYYY-MM-DD" prefix orders events by day
+        # without parsing the timestamps.
+        elif sort_option == "Timestamp (newest first)":
+            filtered = filtered.sort_values("date", ascending=False, kind="stable")
+        elif sort_option == "Timestamp (oldest first)":
+            filtered = filtered.sort_values("date", kind="stable")
+
+        filtered_events = [alerts[i] for i in filtered.index]
+        filtered_fragments = filtered["fragments"].tolist()
+    else:
+        filtered_events = []
+
+    # Display filtered events
+    if filtered_events:
+        if st.session_state.selected_risk_categories == ALL_RISK_CATEGORIES:
+            st.write(f"### Events for: {st.session_state.alerts_source.capitalize()}")
+        else:
+            st.write(f"### Filtered Events for: {st.session_state.alerts_source.capitalize()}")
         st.write("---")
-else:
-    if st.session_state.selected_risk_categories == ALL_RISK_CATEGORIES:
-        st.info("No events available for the selected query.")
+        for event, (body, source_line) in zip(filtered_events, filtered_fragments):
+            st.markdown(body, unsafe_allow_html=True)
+
+            col1, col2 = st.columns([0.85, 0.15])
+            with col1:
+                st.write(source_line)
+            with col2:
+                with st.container():
+                    if st.button("✏️ Edit", key=f"edit_{event['id']}"):
+                        edit_event_dialog(event)
+
+            st.write("---")
     else:
-        st.info("No matching events found based on the selected filters.")
+        if st.session_state.selected_risk_categories == ALL_RISK_CATEGORIES:
+            st.info("No events available for the selected query.")
+        else:
+            st.info("No matching events found based on the selected filters.")
+
+
+filters_and_events(st.session_state.alerts)
 
 
 if "edited_event" in st.session_state:
     updated_event = st.session_state.pop("edited_event")
 
     if updated_event is not None:
-        update_event(updated_event)
-        st.success(f"Event '{updated_event['title']}' updated successfully!")
-
-    try:
-        assessed_events = fetch_assessed_events(supply_chain_id=supply_chain_id)
-        if not assessed_events:
-            st.info("No assessed events found for this supply chain.")
-        else:
-            st.session_state.alerts = assessed_events
-            st.session_state.alerts_source = "existing"
+        try:
+            # The backend echoes the validated event back, so the loaded list is patched with it
+            # instead of being fetched again. A new list is stored so the alerts frame is rebuilt.
+            saved_event = update_event(updated_event).get("event", updated_event)
+            st.session_state.alerts = [
+                saved_event if event["id"] == saved_event["id"] else event
+                for event in st.session_state.alerts or []
+            ]
+            st.success(f"Event '{updated_event['title']}' updated successfully!")
             st.rerun()
-    except Exception as e:
-        st.error(f"Error reloading events: {e}")
+        except Exception as e:
+            st.error(f"Error updating event: {e}")
+    else:
+        # The event was deleted, so reload the remaining ones.
+        try:
+            assessed_events = fetch_assessed_events(supply_chain_id=supply_chain_id)
+            if not assessed_events:
+                st.info("No assessed events found for this supply chain.")
+            else:
+                st.session_state.alerts = assessed_events
+                st.session_state.alerts_source = "existing"
+                st.rerun()
+        except Exception as e:
+            st.error(f"Error reloading events: {e}")
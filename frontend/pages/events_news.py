@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.api_client import fetch_new_events
+from utils.api_client import fetch_new_events, start_events_backfill, advance_events_backfill
 import requests
 from datetime import date, timedelta
 from smolagents import tool
@@ -84,6 +84,29 @@ if st.button("Fetch Events"):
     fetch_and_store_events(query=query, page_size=page_size, from_date=from_date, to_date=to_date)
 
 
+with st.expander("Bulk backfill", expanded=False):
+    st.write(
+        "Process a large number of articles in the background at half the cost. "
+        "Results can take up to 24 hours and are saved to the database once the backfill completes."
+    )
+    backfill_size = st.number_input("Number of articles to backfill:", min_value=1, max_value=1000, value=100, step=10)
+    if st.button("Start Backfill"):
+        try:
+            job = start_events_backfill(query=query, page_size=int(backfill_size), from_date=from_date, to_date=to_date)
+            st.session_state.backfill_job_id = job["id"]
+            st.success(f"Started backfill of {job['article_count']} articles (status: {job['status']}).")
+        except requests.exceptions.RequestException as e:
+            st.error(f"Error starting backfill: {e}")
+    if st.session_state.get("backfill_job_id") and st.button("Check Backfill Status"):
+        try:
+            job = advance_events_backfill(st.session_state.backfill_job_id)
+            st.info(f"Backfill status: {job['status']} ({job['event_count']} events)")
+            if job.get("error"):
+                st.error(job["error"])
+        except requests.exceptions.RequestException as e:
+            st.error(f"Error fetching backfill status: {e}")
+
+
 def display_events(events):
     """Display the list of events."""
     if events:
@@ -115,10 +138,10 @@ def display_events(events):
 def filter_events():
     """Filter events by selected risk categories."""
     if st.session_state.last_topic in st.session_state.events:
+        selected_categories = frozenset(st.session_state.selected_risk_categories)
         return [
             event for event in st.session_state.events[st.session_state.last_topic]
-            if any(risk["class_name"] in st.session_state.selected_risk_categories for risk in
-                   event.get("risk_categories", []))
+            if not selected_categories.isdisjoint(risk["class_name"] for risk in event.get("risk_categories", []))
         ]
     return []
 
@@ -132,14 +155,7 @@ with st.expander("Filter Events", expanded=False):
         key="selected_risk_categories"
     )
 
-if st.session_state.events:
-    filtered_events = [
-        event for event in st.session_state.events.get(st.session_state.last_topic, [])
-        if any(risk["class_name"] in st.session_state.selected_risk_categories for risk in
-               event.get("risk_categories", []))
-    ]
-else:
-    filtered_events = []
+filtered_events = filter_events() if st.session_state.events else []
 
 # Display events
 if filtered_events:
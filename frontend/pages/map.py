@@ -1,9 +1,5 @@
-import math
+import pydeck as pdk
 import streamlit as st
-from folium import Tooltip
-from folium.plugins import AntPath
-from streamlit_folium import st_folium
-import folium
 from utils.api_client import fetch_supply_chain, fetch_assessed_events
 
 st.title("Map & Supply Chain Visualization")
@@ -23,9 +19,16 @@ else:
         "supply_chain" not in st.session_state
         or st.session_state.supply_chain is None
         or st.session_state.supply_chain["id"] != st.session_state.selected_supply_chain["id"]
+        or "supply_chain_node_locations" not in st.session_state
     ):
         try:
             st.session_state.supply_chain = fetch_supply_chain(st.session_state.selected_supply_chain["id"])
+            # Coordinates of each located node, built once per fetched chain for drawing the edges.
+            st.session_state.supply_chain_node_locations = {
+                node["id"]: node["location"]["coordinates"]
+                for node in st.session_state.supply_chain.get("nodes", [])
+                if node.get("location", {}).get("coordinates")
+            }
         except Exception as e:
             st.error(f"Error fetching supply chain: {e}")
 
@@ -35,184 +38,176 @@ if 'map_events_source' not in st.session_state:
     st.session_state.map_events_source = None
 
 
-def create_shape_marker(lat, lon, popup_content, tooltip_text, shape, color, size, folium_map):
-    html_marker = f"""
-    <div style="font-size: {size}; color: {color}; text-align: center; transform: translate(-50%, -50%);">
-        {shape}
-    </div>
-    """
-    folium.Marker(
-        location=[lat, lon],
-        popup=folium.Popup(popup_content, max_width=300),
-        tooltip=tooltip_text,
-        icon=folium.DivIcon(html=html_marker)
-    ).add_to(folium_map)
-
-
+# Layer colors (RGB) for the CSS colors used in the legend below.
 NODE_COLORS = {
-    "Supplier": "green",
-    "Factory": "blue",
-    "Distribution Center": "purple",
-    "Port": "darkblue",
-    "Customer": "orange",
-    "Unknown": "gray"
+    "Supplier": [0, 128, 0],  # green
+    "Factory": [0, 0, 255],  # blue
+    "Distribution Center": [128, 0, 128],  # purple
+    "Port": [0, 0, 139],  # darkblue
+    "Customer": [255, 165, 0],  # orange
+    "Unknown": [128, 128, 128]  # gray
 }
 
-NODE_SHAPES = {
-    "Supplier": ("⬤", "12px"),
-    "Factory": ("▲", "20px"),
-    "Distribution Center": ("⬢", "22px"),
-    "Port": ("◆", "26px"),
-    "Customer": ("⬟", "18px"),
-    "Unknown": ("■", "24px")
+TRANSPORT_COLORS = {
+    "Sea": [0, 0, 255],  # blue
+    "Rail": [255, 0, 0],  # red
+    "Air": [0, 128, 0],  # green
+    "Road": [255, 165, 0],  # orange
+    "Unknown": [128, 128, 128]  # gray
 }
 
+EVENT_COLOR = [255, 0, 0]  # red
+
 
-def add_supply_chain_nodes(supply_chain, folium_map):
+def supply_chain_nodes_data(supply_chain):
+    nodes = []
     for node in supply_chain.get("nodes", []):
         location = node.get("location", {})
         if location and location.get("coordinates"):
             lat, lon = location["coordinates"]
             node_type = node.get("type", "Unknown")
-            popup_content = (
-                f"<b>{node['id']}</b><br>"
-                f"Type: {node_type}<br>"
-                f"Location: {location.get('city', 'N/A')}, {location.get('country', 'N/A')}"
-            )
-            shape, size = NODE_SHAPES.get(node_type, ("■", "24px"))
-            color = NODE_COLORS.get(node_type, "gray")
-
-            create_shape_marker(
-                lat=lat,
-                lon=lon,
-                popup_content=popup_content,
-                tooltip_text=f"Supply Chain Node: {node_type}",
-                shape=shape,
-                color=color,
-                size=size,
-                folium_map=folium_map
-            )
-
-
-def calculate_arc_coordinates(source, destination, num_points=50, arc_height=0.3):
-    """
-    Generate a set of points to create a curved line (arc) between two locations.
-    """
-    lat1, lon1 = math.radians(source[0]), math.radians(source[1])
-    lat2, lon2 = math.radians(destination[0]), math.radians(destination[1])
-
-    mid_lat = (lat1 + lat2) / 2
-    mid_lon = (lon1 + lon2) / 2
-
-    dx = lon2 - lon1
-    dy = lat2 - lat1
-    mid_lat += -arc_height * dx
-    mid_lon += arc_height * dy
-
-    arc_points = []
-    for t in range(num_points + 1):
-        fraction = t / num_points
-        lat = (1 - fraction) * lat1 + fraction * lat2 + arc_height * (1 - fraction) * fraction * -dx
-        lon = (1 - fraction) * lon1 + fraction * lon2 + arc_height * (1 - fraction) * fraction * dy
-        arc_points.append([math.degrees(lat), math.degrees(lon)])
-
-    return arc_points
-
-
-TRANSPORT_COLORS = {
-    "Sea": "blue",
-    "Rail": "red",
-    "Air": "green",
-    "Road": "orange",
-    "Unknown": "gray"
-}
-
-
-def add_supply_chain_edges(supply_chain, folium_map):
-    node_locations = {
-        node["id"]: node["location"]["coordinates"]
-        for node in supply_chain.get("nodes", [])
-        if node.get("location", {}).get("coordinates")
-    }
-
+            nodes.append({
+                "position": [lon, lat],
+                "color": NODE_COLORS.get(node_type, NODE_COLORS["Unknown"]),
+                "tooltip": (
+                    f"<b>{node['id']}</b><br>"
+                    f"Type: {node_type}<br>"
+                    f"Location: {location.get('city', 'N/A')}, {location.get('country', 'N/A')}"
+                ),
+            })
+    return nodes
+
+
+def supply_chain_edges_data(supply_chain, node_locations):
+    edges = []
     for edge in supply_chain.get("edges", []):
         source = edge.get("source")
         destination = edge.get("destination")
-
         if source in node_locations and destination in node_locations:
-            source_coords = node_locations[source]
-            destination_coords = node_locations[destination]
-            arc_points = calculate_arc_coordinates(source_coords, destination_coords, arc_height=0.3)
-
+            source_lat, source_lon = node_locations[source][:2]
+            destination_lat, destination_lon = node_locations[destination][:2]
             transport_mode = edge.get('transportMode', 'Unknown')
-            color = TRANSPORT_COLORS.get(transport_mode, "gray")
+            edges.append({
+                "source": [source_lon, source_lat],
+                "destination": [destination_lon, destination_lat],
+                "color": TRANSPORT_COLORS.get(transport_mode, TRANSPORT_COLORS["Unknown"]),
+                "tooltip": transport_mode,
+            })
+    return edges
 
-            path = AntPath(
-                locations=arc_points,
-                color=color,
-                weight=2.5,
-                opacity=0.8,
-                dash_array=[10, 20],
-                pulse_color="white"
-            )
-            path.add_child(Tooltip(transport_mode))
-            path.add_to(folium_map)
 
-
-def add_events_to_map(events_data, folium_map):
+def events_data_points(events_data):
     events = events_data.get("data", []) if isinstance(events_data, dict) else events_data
+    points = []
     for event in events:
         location = event.get("location", {})
         if location and location.get("coordinates"):
             lat, lon = location["coordinates"]
             title = event.get("title", "No Title")
             description = event.get("description", "No description available.")
-            popup_content = f"<b>{title}</b><br>{description}"
-
-            folium.Marker(
-                location=[lat, lon],
-                popup=folium.Popup(popup_content, max_width=300),
-                tooltip=f"Event: {title}",
-                icon=folium.Icon(color="red", icon="circle")
-            ).add_to(folium_map)
+            points.append({"position": [lon, lat], "tooltip": f"<b>Event: {title}</b><br>{description}"})
+    return points
 
 
-# Single button for loading events (already assessed)
-if st.button("Load Assessed Events"):
-    if (
-        st.session_state.map_events_source == "events"
-        and st.session_state.map_events
-        and st.session_state.selected_supply_chain["id"] == st.session_state.map_events.get("supply_chain_id")
-    ):
-        st.success("Using cached assessed events.")
-    else:
-        try:
-            data = fetch_assessed_events(supply_chain_id=st.session_state.selected_supply_chain["id"])
-            st.session_state.map_events = {
-                "data": data,
-                "supply_chain_id": st.session_state.selected_supply_chain["id"]
-            }
-            st.session_state.map_events_source = "events"
-            st.success("Loaded assessed events and displayed them on the map.")
-        except Exception as e:
-            st.error(f"Error loading assessed events: {e}")
-
-# Initialize the map
-m = folium.Map(location=[0, 0], zoom_start=2)
-
-# Add supply chain nodes and edges to the map
-if st.session_state.get("supply_chain"):
-    add_supply_chain_nodes(st.session_state.supply_chain, m)
-    add_supply_chain_edges(st.session_state.supply_chain, m)
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_map_data(supply_chain, node_locations, events_data):
+    """
+    The nodes, edges and events to draw, as plain records for the deck.gl layers; cached so UI reruns
+    only rebuild the (cheap) deck while the supply chain and loaded events are unchanged.
+    """
+    nodes = supply_chain_nodes_data(supply_chain) if supply_chain else []
+    edges = supply_chain_edges_data(supply_chain, node_locations) if supply_chain else []
+    events = events_data_points(events_data) if events_data else []
+    return nodes, edges, events
 
-# Add events to the map
-if st.session_state.map_events:
-    add_events_to_map(st.session_state.map_events, m)
-else:
-    st.info("No events loaded yet. Click the button above to load assessed events.")
 
-# Display the map
-st_folium(m, width=700, height=500)
+def build_map(nodes, edges, events):
+    """
+    The map as a deck.gl (WebGL) deck, where each layer is drawn in one batch on the GPU instead of
+    as one DOM element per marker; edges are drawn as great-circle arcs.
+    """
+    layers = [
+        pdk.Layer(
+            "ArcLayer",
+            data=edges,
+            get_source_position="source",
+            get_target_position="destination",
+            get_source_color="color",
+            get_target_color="color",
+            get_width=2.5,
+            great_circle=True,
+            pickable=True,
+        ),
+        pdk.Layer(
+            "ScatterplotLayer",
+            data=nodes,
+            get_position="position",
+            get_fill_color="color",
+            get_radius=60000,
+            radius_min_pixels=5,
+            radius_max_pixels=14,
+            pickable=True,
+        ),
+        pdk.Layer(
+            "ScatterplotLayer",
+            data=events,
+            get_position="position",
+            get_fill_color=EVENT_COLOR,
+            get_line_color=[255, 255, 255],
+            line_width_min_pixels=1,
+            stroked=True,
+            get_radius=40000,
+            radius_min_pixels=4,
+            radius_max_pixels=10,
+            pickable=True,
+        ),
+    ]
+    return pdk.Deck(
+        layers=layers,
+        initial_view_state=pdk.ViewState(latitude=0, longitude=0, zoom=1),
+        map_style=None,
+        tooltip={"html": "{tooltip}", "style": {"maxWidth": "300px"}},
+    )
+
+
+@st.fragment
+def events_and_map():
+    """
+    The Load Assessed Events button and the map, rerun on their own when the button is clicked.
+    """
+    # Single button for loading events (already assessed)
+    if st.button("Load Assessed Events"):
+        if (
+            st.session_state.map_events_source == "events"
+            and st.session_state.map_events
+            and st.session_state.selected_supply_chain["id"] == st.session_state.map_events.get("supply_chain_id")
+        ):
+            st.success("Using cached assessed events.")
+        else:
+            try:
+                data = fetch_assessed_events(supply_chain_id=st.session_state.selected_supply_chain["id"])
+                st.session_state.map_events = {
+                    "data": data,
+                    "supply_chain_id": st.session_state.selected_supply_chain["id"]
+                }
+                st.session_state.map_events_source = "events"
+                st.success("Loaded assessed events and displayed them on the map.")
+            except Exception as e:
+                st.error(f"Error loading assessed events: {e}")
+
+    if not st.session_state.map_events:
+        st.info("No events loaded yet. Click the button above to load assessed events.")
+
+    # Display the map
+    nodes, edges, events = build_map_data(
+        st.session_state.get("supply_chain"),
+        st.session_state.get("supply_chain_node_locations", {}),
+        st.session_state.map_events,
+    )
+    st.pydeck_chart(build_map(nodes, edges, events), width=700, height=500)
+
+
+events_and_map()
 
 st.markdown(
     """
@@ -227,25 +222,25 @@ st.markdown(
     ">
         <b>Legend</b><br>
         <i style="color: green;">⬤ Supplier</i><br>
-        <i style="color: blue;">▲ Factory</i><br>
-        <i style="color: purple;">⬢ Distribution Center</i><br>
-        <i style="color: darkblue;">◆ Port</i><br>
-        <i style="color: orange;">⬟ Customer</i><br>
-        <i style="color: gray;">■ Unknown</i><br>
+        <i style="color: blue;">⬤ Factory</i><br>
+        <i style="color: purple;">⬤ Distribution Center</i><br>
+        <i style="color: darkblue;">⬤ Port</i><br>
+        <i style="color: orange;">⬤ Customer</i><br>
+        <i style="color: gray;">⬤ Unknown</i><br>
         <span style="display: inline-flex; align-items: center;">
-            <span style="width: 20px; height: 0; border-top: 2px dashed blue; margin-right: 5px;"></span>
+            <span style="width: 20px; height: 0; border-top: 2px solid blue; margin-right: 5px;"></span>
             <i style="color: blue;">Sea Route</i>
         </span><br>
         <span style="display: inline-flex; align-items: center;">
-            <span style="width: 20px; height: 0; border-top: 2px dashed orange; margin-right: 5px;"></span>
+            <span style="width: 20px; height: 0; border-top: 2px solid orange; margin-right: 5px;"></span>
             <i style="color: orange;">Road Route</i>
         </span><br>
         <span style="display: inline-flex; align-items: center;">
-            <span style="width: 20px; height: 0; border-top: 2px dashed green; margin-right: 5px;"></span>
+            <span style="width: 20px; height: 0; border-top: 2px solid green; margin-right: 5px;"></span>
             <i style="color: green;">Air Route</i>
         </span><br>
         <span style="display: inline-flex; align-items: center;">
-            <span style="width: 20px; height: 0; border-top: 2px dashed red; margin-right: 5px;"></span>
+            <span style="width: 20px; height: 0; border-top: 2px solid red; margin-right: 5px;"></span>
             <i style="color: red;">Rail Route</i>
         </span><br>
         <i style="color: red;">⬤ Event</i>
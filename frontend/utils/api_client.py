@@ -1,108 +1,213 @@
+from typing import Any, Dict, Tuple
+
+import orjson
 import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "http://backend:8000"
 
+# (connect, read) timeouts; the long one is for endpoints that call out to NewsAPI or GPT.
+TIMEOUT = (3, 30)
+LONG_TIMEOUT = (3, 600)
+
+# One session for all calls, so connections to the backend are kept alive and reused.
+# GETs are retried on connection errors and gateway errors, other methods are not.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=frozenset({"GET"}),
+        raise_on_status=False
+    )
+)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+
+def _json(response: requests.Response) -> Any:
+    """Decode a JSON response body with orjson, several times faster than requests' stdlib-based .json()."""
+    return orjson.loads(response.content)
+
+
+# url -> (ETag, body) of the last response to a conditional GET, shared by every session of this
+# process. Bodies are kept encoded, so each caller decodes its own copy and cannot change another
+# session's data.
+_CONDITIONAL_CACHE: Dict[str, Tuple[str, bytes]] = {}
+
+
+def _conditional_get(url: str, timeout=TIMEOUT):
+    """
+    GET url, sending the ETag of the last response for it, and reuse that response's body when the
+    backend answers 304 Not Modified instead of downloading it again. Every call revalidates, so
+    changes made by other clients or by background jobs show up on the next call.
+    """
+    cached = _CONDITIONAL_CACHE.get(url)
+    headers = {"If-None-Match": cached[0]} if cached else None
+    response = _SESSION.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached:
+        return orjson.loads(cached[1])
+    response.raise_for_status()
+    body = _json(response)
+    etag = response.headers.get("ETag")
+    if etag:
+        _CONDITIONAL_CACHE[url] = (etag, response.content)
+    return body
+
 
 def get_root_message():
-    response = requests.get(f"{BASE_URL}/")
+    response = _SESSION.get(f"{BASE_URL}/", timeout=TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return _json(response)
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_new_events(query: str, page_size: int = 10, from_date: str = None, to_date: str = None):
     """
     Fetches new events using the /events/new endpoint.
+    Cached for an hour per (query, page_size, from_date, to_date), like the backend's news cache,
+    so fetching the same search again does not re-run the extraction pipeline.
     """
     params = {"query": query, "page_size": page_size}
     if from_date:
         params["from_date"] = from_date
     if to_date:
         params["to_date"] = to_date
-    response = requests.get(f"{BASE_URL}/events/new", params=params)
+    response = _SESSION.get(f"{BASE_URL}/events/new", params=params, timeout=LONG_TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return _json(response)
+
+
+def start_events_backfill(query: str, page_size: int = 100, from_date: str = None, to_date: str = None):
+    """
+    Starts a bulk backfill via the /events/backfill endpoint; events are processed through the
+    OpenAI Batch API and saved once the job completes.
+    """
+    params = {"query": query, "page_size": page_size}
+    if from_date:
+        params["from_date"] = from_date
+    if to_date:
+        params["to_date"] = to_date
+    response = _SESSION.post(f"{BASE_URL}/events/backfill", params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+    return _json(response)
+
+
+def advance_events_backfill(job_id: str):
+    """
+    Advances a backfill job (once its current batch has finished) and fetches its status via the
+    POST /events/backfill/{job_id} endpoint.
+    """
+    response = _SESSION.post(f"{BASE_URL}/events/backfill/{job_id}", timeout=TIMEOUT)
+    response.raise_for_status()
+    return _json(response)
 
 
 def fetch_saved_events():
     """
     Fetches saved events from the /events/saved endpoint.
     """
-    response = requests.get(f"{BASE_URL}/events/saved")
+    response = _SESSION.get(f"{BASE_URL}/events/saved", timeout=TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return _json(response)
 
 
 def assess_unassessed_events(supply_chain_id: int = 1):
     """
     Assesses unassessed events for the given supply chain via the /supply_chains/{id}/events/assess endpoint.
     """
-    response = requests.post(f"{BASE_URL}/supply_chains/{supply_chain_id}/events/assess", json={})
+    response = _SESSION.post(
+        f"{BASE_URL}/supply_chains/{supply_chain_id}/events/assess", json={}, timeout=LONG_TIMEOUT
+    )
     response.raise_for_status()
-    data = response.json()
+    data = _json(response)
     return data.get("assessed_events", [])
 
 
 def fetch_assessed_events(supply_chain_id: int = 1):
     """
     Fetches assessed events for the given supply chain via the /supply_chains/{id}/events/assessed endpoint.
+    Revalidated with the last response's ETag, so unchanged events are not downloaded again.
     """
-    response = requests.get(f"{BASE_URL}/supply_chains/{supply_chain_id}/events/assessed")
-    response.raise_for_status()
-    return response.json()["assessed_events"]
+    return _conditional_get(f"{BASE_URL}/supply_chains/{supply_chain_id}/events/assessed")["assessed_events"]
+
+
+def fetch_assessed_events_aggregates(supply_chain_id: int = 1):
+    """
+    Fetches the counts per risk level, risk class and risk family of the assessed events of the
+    given supply chain via the /supply_chains/{id}/events/assessed/aggregates endpoint, as
+    {"total_events": n, "by_level": {...}, "by_class": {...}, "subcategory_counts": {...}}.
+    Revalidated like fetch_assessed_events.
+    """
+    return _conditional_get(f"{BASE_URL}/supply_chains/{supply_chain_id}/events/assessed/aggregates")
 
 
 def fetch_supply_chain(supply_chain_id: int):
     """
     Fetches the supply chain data for the specified ID.
     """
-    response = requests.get(f"{BASE_URL}/supply_chains/{supply_chain_id}")
+    response = _SESSION.get(f"{BASE_URL}/supply_chains/{supply_chain_id}", timeout=TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return _json(response)
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_supply_chains():
     """
     Fetches all supply chains from the backend.
+    Cached for a minute, since the sidebar calls this on every Streamlit rerun.
     """
-    response = requests.get(f"{BASE_URL}/supply_chains")
+    response = _SESSION.get(f"{BASE_URL}/supply_chains", timeout=TIMEOUT)
     response.raise_for_status()
-    return response.json()["supply_chains"]
+    return _json(response)["supply_chains"]
 
 
 def set_selected_supply_chain(supply_chain_id: str):
     """
     Sets the selected supply chain via the /supply_chains/selected endpoint.
     """
-    response = requests.post(f"{BASE_URL}/supply_chains/selected", json={"supply_chain_id": supply_chain_id})
+    response = _SESSION.post(
+        f"{BASE_URL}/supply_chains/selected", json={"supply_chain_id": supply_chain_id}, timeout=TIMEOUT
+    )
     response.raise_for_status()
-    return response.json()
+    return _json(response)
 
 
 def get_selected_supply_chain():
     """
     Fetches the currently selected supply chain from the /supply_chains/selected endpoint.
     """
-    response = requests.get(f"{BASE_URL}/supply_chains/selected")
+    response = _SESSION.get(f"{BASE_URL}/supply_chains/selected", timeout=TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return _json(response)
 
 
 def fetch_bayesian_risk_scores():
     """
     Computes and fetches the latest Bayesian risk scores for the currently selected supply chain.
     """
-    response = requests.get(f"{BASE_URL}/supply_chains/selected/risk_scores")
+    response = _SESSION.get(f"{BASE_URL}/supply_chains/selected/risk_scores", timeout=LONG_TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return _json(response)
 
 
 def fetch_stored_bayesian_risk_scores():
     """
     Fetches the stored Bayesian risk scores for the currently selected supply chain.
     """
-    response = requests.get(f"{BASE_URL}/supply_chains/selected/risk_scores/stored")
-    response.raise_for_status()
-    return response.json()
+    return _conditional_get(f"{BASE_URL}/supply_chains/selected/risk_scores/stored")
+
+
+def fetch_dashboard_bundle(supply_chain_id: int = 1):
+    """
+    Fetches the assessed event aggregates (see fetch_assessed_events_aggregates) and the stored
+    Bayesian risk scores of the given supply chain in one request via the /supply_chains/{id}/dashboard
+    endpoint, as {"assessed_event_aggregates": {...}, "stored_risk_scores": {...}}.
+    Revalidated like fetch_assessed_events, so it is cheap to call on every rerun.
+    """
+    return _conditional_get(f"{BASE_URL}/supply_chains/{supply_chain_id}/dashboard")
 
 
 def update_event(event: dict):
@@ -112,9 +217,9 @@ def update_event(event: dict):
     """
     if "id" not in event:
         raise ValueError("Event must have an 'id' field.")
-    response = requests.put(f"{BASE_URL}/events/update", json=event)
+    response = _SESSION.put(f"{BASE_URL}/events/update", json=event, timeout=TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return _json(response)
 
 
 def delete_event(event: dict):
@@ -124,6 +229,6 @@ def delete_event(event: dict):
     """
     if "id" not in event:
         raise ValueError("Event must have an 'id' field.")
-    response = requests.delete(f"{BASE_URL}/events/delete", json=event)
+    response = _SESSION.delete(f"{BASE_URL}/events/delete", json=event, timeout=TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return _json(response)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from scipy.integrate import quad
+from scipy.stats import beta
+
+from backend.services.bayesian_risk_assessment_service import _posterior_mean
+
+
+def _reference_posterior_mean(severities, kappa):
+    """Posterior mean by adaptive quadrature, evaluating the Beta likelihood of every observation."""
+    s = np.clip(np.asarray(severities, dtype=float), 1e-6, 1 - 1e-6)
+
+    def log_posterior(theta):
+        return beta.logpdf(theta, 1, 4) + beta.logpdf(s, kappa * theta, kappa * (1 - theta)).sum()
+
+    # Shift by the (fine-grid) maximum so the exponentials neither overflow nor underflow.
+    grid = np.linspace(1e-4, 1 - 1e-4, 2001)[:, np.newaxis]
+    peak = (beta.logpdf(grid[:, 0], 1, 4) + beta.logpdf(s, kappa * grid, kappa * (1 - grid)).sum(axis=1)).max()
+    points = [theta for theta in np.linspace(0.01, 0.99, 99)]
+    mass = quad(lambda t: np.exp(log_posterior(t) - peak), 0, 1, points=points, limit=500)[0]
+    moment = quad(lambda t: t * np.exp(log_posterior(t) - peak), 0, 1, points=points, limit=500)[0]
+    return moment / mass
+
+
+@pytest.mark.parametrize("severities", [
+    [0.5],
+    [0.05, 0.1, 0.2],
+    [0.9, 0.8, 0.95, 0.7],
+    np.random.default_rng(0).uniform(0, 1, 200),
+])
+@pytest.mark.parametrize("kappa", [2.0, 5.0])
+def test_posterior_mean_matches_quadrature(severities, kappa):
+    assert _posterior_mean(np.asarray(severities), kappa) == pytest.approx(
+        _reference_posterior_mean(severities, kappa), abs=1e-4
+    )
+
+
+def test_posterior_mean_handles_boundary_severities():
+    result = _posterior_mean(np.array([0.0, 1.0, 1.0]), 5.0)
+    assert 0 < result < 1
+    assert result == pytest.approx(_reference_posterior_mean([0.0, 1.0, 1.0], 5.0), abs=1e-4)
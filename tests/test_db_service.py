@@ -0,0 +1,134 @@
+import orjson
+import pytest
+
+from backend.models.models import Event, EventRiskAssessment
+from backend.services.db_service import DBService
+
+
+def _event(event_id: str, **fields) -> Event:
+    record = {"id": event_id, "title": f"Event {event_id}", "timestamp": "2024-01-01T00:00:00Z",
+              "url": f"https://example.com/{event_id}", "is_event": True}
+    return Event(**{**record, **fields})
+
+
+def _supply_chain(supply_chain_id: str, company_name: str = "ACME") -> dict:
+    return {"id": supply_chain_id, "companyName": company_name, "description": "", "nodes": [], "edges": []}
+
+
+@pytest.fixture
+def legacy_path(tmp_path):
+    # TinyDB layout: one table per top-level key, documents keyed by their document ID.
+    path = tmp_path / "database.json"
+    path.write_bytes(orjson.dumps({
+        "supply_chains": {"1": _supply_chain("sc-1")},
+        "events": {
+            "1": _event("e-1").model_dump(exclude={"risk_assessment"}),
+            "2": _event("e-2", supply_chain_id="sc-1",
+                        risk_assessment=EventRiskAssessment(is_relevant=True, risk_score=0.4)).model_dump(),
+        },
+        "settings": {"1": {"key": "selected_supply_chain", "value": "sc-1"}},
+    }))
+    return path
+
+
+@pytest.fixture
+def open_db(tmp_path, legacy_path):
+    opened = []
+
+    def _open():
+        db = DBService(db_name=str(tmp_path / "database.db"), legacy_db_name=str(legacy_path))
+        opened.append(db)
+        return db
+
+    yield _open
+    for db in opened:
+        db.conn.close()
+
+
+def test_legacy_import(open_db):
+    db = open_db()
+    assert db.get_all_supply_chains() == [_supply_chain("sc-1")]
+    assert db.get_selected_supply_chain() == "sc-1"
+    assert [event.id for event in db.get_all_events()] == ["e-1", "e-2"]
+    assert [event.id for event in db.get_unassessed_events()] == ["e-1"]
+    assert [event.id for event in db.get_assessed_events("sc-1")] == ["e-2"]
+
+
+def test_legacy_import_is_idempotent(open_db):
+    db = open_db()
+    db.delete_event("e-1")
+    db.conn.close()
+
+    # Reopening must neither duplicate the imported rows nor bring back deleted ones.
+    db = open_db()
+    assert [event.id for event in db.get_all_events()] == ["e-2"]
+    assert len(db.get_all_supply_chains()) == 1
+
+
+def test_event_insert_upsert_and_delete(open_db):
+    db = open_db()
+    db.delete_all_events()
+
+    db.save_events([_event("a"), _event("b"), _event("skipped").model_copy(update={"is_event": False})])
+    assert [event.id for event in db.get_all_events()] == ["a", "b"]
+    assert db.event_exists("a") and not db.event_exists("skipped")
+
+    # Upserts overwrite in place and keep insertion order.
+    db.save_events([_event("a", title="Updated")])
+    assert [(event.id, event.title) for event in db.get_all_events()] == [("a", "Updated"), ("b", "Event b")]
+
+    # insert_new_events leaves stored events and their assessments untouched.
+    assessed = _event("b", supply_chain_id="sc-1", risk_assessment=EventRiskAssessment(is_relevant=True))
+    db.save_event_assessment(assessed)
+    db.insert_new_events([_event("b"), _event("c")])
+    assert db.get_event_by_id("b") == assessed
+    assert set(db.get_events_by_ids(["a", "c", "missing", ""])) == {"a", "c"}
+
+    db.reset_all_event_assessments()
+    assert [event.id for event in db.get_unassessed_events()] == ["a", "b", "c"]
+    assert db.get_event_by_id("b").risk_assessment is None
+
+    db.delete_event("a")
+    assert db.get_event_by_id("a") is None
+    db.delete_all_events()
+    assert db.get_all_events() == []
+
+
+def test_supply_chain_upsert(open_db):
+    db = open_db()
+    db.add_supply_chain(_supply_chain("sc-2"))
+    db.add_supply_chain(_supply_chain("sc-1", company_name="Renamed"))
+    assert db.get_supply_chain("sc-1")["companyName"] == "Renamed"
+    assert [sc["id"] for sc in db.get_all_supply_chains()] == ["sc-1", "sc-2"]
+
+
+def test_event_paging_crosses_batch_boundary(open_db):
+    db = open_db()
+    db.delete_all_events()
+    ids = [f"e-{i:04d}" for i in range(1201)]
+    db.save_events([
+        _event(event_id, supply_chain_id="sc-1", risk_assessment=EventRiskAssessment(is_relevant=i % 2 == 0))
+        for i, event_id in enumerate(ids)
+    ])
+
+    assert [orjson.loads(data)["id"] for data in db.iter_all_events_raw()] == ids
+    assert [orjson.loads(data)["id"] for data in db.iter_assessed_events_raw("sc-1")] == ids[::2]
+    assert len(db.get_events_by_ids(ids)) == len(ids)
+
+
+def test_data_version_changes_after_writes(open_db):
+    db = open_db()
+    versions = [db.data_version()]
+    for write in (
+        lambda: db.save_events([_event("new")]),
+        lambda: db.save_event_assessment(_event("new", risk_assessment=EventRiskAssessment(is_relevant=False))),
+        lambda: db.add_supply_chain(_supply_chain("sc-3")),
+        lambda: db.delete_event("new"),
+    ):
+        write()
+        versions.append(db.data_version())
+    assert len(set(versions)) == len(versions)
+
+    # Reads leave it unchanged.
+    db.get_all_events()
+    assert db.data_version() == versions[-1]
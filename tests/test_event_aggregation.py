@@ -0,0 +1,36 @@
+import orjson
+
+from backend.services.event_aggregation import aggregate_events
+
+
+def _record(risk_score=None, risk_categories=None, assessed=True) -> bytes:
+    event = {"id": "e", "title": "t", "timestamp": "2024-01-01T00:00:00Z", "url": "u", "is_event": True,
+             "risk_categories": risk_categories,
+             "risk_assessment": {"is_relevant": True, "risk_score": risk_score} if assessed else None}
+    return orjson.dumps(event)
+
+
+def test_aggregate_events():
+    records = [
+        _record(0.05, [{"class_name": "Geopolitical", "families": ["Trade Policy", " Sanctions "]}]),
+        # Scores at a threshold fall into the upper level.
+        _record(0.10, [{"class_name": "Geopolitical", "families": ["Trade Policy"]},
+                       {"class_name": "Financial", "families": None}]),
+        _record(0.75, [{"class_name": "Environmental", "families": ["", "  "]}]),
+        _record(0.99, [{"class_name": None, "families": ["Sanctions"]}]),
+        _record(0.6, []),
+        _record(None, [{"class_name": "Financial"}]),
+        _record(float("nan"), None),
+        _record(assessed=False),
+    ]
+
+    assert aggregate_events(records) == {
+        "total_events": 8,
+        "by_level": {"Very Low Risk": 1, "Low Risk": 1, "High Risk": 1, "Extreme Risk": 2},
+        "by_class": {"Geopolitical": 2, "Financial": 2, "Environmental": 1, "": 1},
+        "subcategory_counts": {"Trade Policy": 2, "Sanctions": 2},
+    }
+
+
+def test_aggregate_no_events():
+    assert aggregate_events([]) == {"total_events": 0, "by_level": {}, "by_class": {}, "subcategory_counts": {}}
@@ -0,0 +1,17 @@
+import importlib.util
+from pathlib import Path
+
+from backend.services import event_aggregation
+
+# The frontend image is built without the backend package, so it keeps its own copy of the risk
+# levels; this keeps the two in step.
+_spec = importlib.util.spec_from_file_location(
+    "frontend_risk_levels", Path(__file__).resolve().parent.parent / "frontend" / "components" / "risk_levels.py"
+)
+frontend_risk_levels = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(frontend_risk_levels)
+
+
+def test_backend_and_frontend_risk_levels_match():
+    assert tuple(frontend_risk_levels.RISK_LEVEL_THRESHOLDS.tolist()) == event_aggregation.RISK_LEVEL_THRESHOLDS
+    assert tuple(frontend_risk_levels.RISK_LEVEL_LABELS.tolist()) == event_aggregation.RISK_LEVELS